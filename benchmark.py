@@ -0,0 +1,213 @@
+"""Reproducible benchmarks: IBM-Quest-style synthetic baskets, a grid of miners and minsup values, results as JSON."""
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+import importlib.util
+import argparse
+import bisect
+import json
+import math
+import os
+import random
+import resource
+import sys
+import time
+
+from transaction_loader import load_transactions
+
+# Miner configurations the grid runs by default, the counting engine only applies to apriori
+CONFIGURATIONS = (("apriori", "naive"), ("apriori", "trie"), ("eclat", "trie"), ("fpgrowth", "trie"))
+
+def poisson(rng, mean):
+    """Draw from a Poisson distribution (Knuth's method, fine for the small means used here)."""
+    limit = math.exp(-mean)
+    count = 0
+    product = rng.random()
+    while product > limit:
+        count += 1
+        product *= rng.random()
+    return count
+
+def generate_quest_transactions(num_transactions, avg_length, num_items, num_patterns=None, avg_pattern_length=4,
+                                correlation=0.5, seed=0):
+    """Generate baskets the way the IBM Quest generator does.
+
+    A pool of potentially frequent patterns is drawn first. Pattern sizes are Poisson around avg_pattern_length, a
+    fraction of each pattern (exponential around correlation) is taken over from the previous one, pattern weights
+    are exponential and every pattern has a corruption level. Baskets have a Poisson size around avg_length and
+    are filled with weighted patterns, dropping items while a uniform draw stays below the corruption level.
+    """
+    rng = random.Random(seed)
+    num_patterns = num_patterns or max(1, num_items // 5)
+
+    # The pool of patterns, each with a weight and a corruption level
+    patterns = []
+    previous = []
+    for _ in range(num_patterns):
+        size = max(1, poisson(rng, avg_pattern_length))
+        shared = min(len(previous), size, int(round(rng.expovariate(1 / correlation) * size))) if previous else 0
+        pattern = set(rng.sample(previous, shared))
+        while len(pattern) < min(size, num_items):
+            pattern.add(rng.randrange(num_items))
+        previous = sorted(pattern)
+        patterns.append(previous)
+    weights = [rng.expovariate(1) for _ in patterns]
+    cumulative = []
+    total = 0
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+    corruption = [min(1.0, max(0.0, rng.gauss(0.5, 0.1))) for _ in patterns]
+
+    transactions = []
+    carried = None
+    for _ in range(num_transactions):
+        size = max(1, poisson(rng, avg_length))
+        basket = set()
+        while len(basket) < size:
+            # A pattern that did not fit the previous basket is tried first
+            index = carried if carried is not None else bisect.bisect_left(cumulative, rng.random() * total)
+            carried = None
+            items = list(patterns[index])
+            while items and rng.random() < corruption[index]:
+                items.pop(rng.randrange(len(items)))
+            if basket and len(basket) + len(items) > size:
+                # Half of the time an oversized pattern is put in anyway, otherwise it moves to the next basket
+                if rng.random() < 0.5:
+                    basket.update(items)
+                else:
+                    carried = index
+                break
+            basket.update(items)
+        transactions.append(sorted(basket))
+    return transactions
+
+def write_transactions(transactions, file_name):
+    """Write transactions in the "transaction_id item_id" format the miners read."""
+    with open(file_name, "w") as file:
+        for tid, transaction in enumerate(transactions):
+            for item in transaction:
+                file.write(f"{tid} {item}\n")
+
+def load_miners():
+    """Import generate-rules03.py, whose file name is not a valid module name."""
+    module = sys.modules.get("generate_rules03")
+    if module is None:
+        spec = importlib.util.spec_from_file_location("generate_rules03", os.path.join(os.path.dirname(os.path.abspath(__file__)), "generate-rules03.py"))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["generate_rules03"] = module
+        spec.loader.exec_module(module)
+    return module
+
+def run_case(file_name, algorithm, counter, min_support, min_confidence):
+    """Mine one configuration and return its measurements, run in a fresh process."""
+    miners = load_miners()
+    transactions = load_transactions(file_name)
+    miner = miners.build_miner(algorithm, min_support, min_confidence, counter)
+
+    start_time = time.perf_counter()
+    frequent_itemsets, rules, _, _ = miner.run(transactions)
+    wall_time = time.perf_counter() - start_time
+
+    # ru_maxrss is the peak resident set of this process in kilobytes on Linux
+    return {
+        "algorithm": algorithm,
+        "counter": counter,
+        "minsup": min_support,
+        "minconf": min_confidence,
+        "wall_time": wall_time,
+        "frequent_itemsets_time": miner.frequent_itemsets_time,
+        "association_rules_time": miner.association_rules_time,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "frequent_itemsets": {str(k): len(itemsets) for k, itemsets in frequent_itemsets.items()},
+        "levels": {str(k): stats for k, stats in miner.level_stats.items()},
+        "rules": len(rules),
+    }
+
+def run_benchmark(file_name, min_supports, min_confidence, configurations=CONFIGURATIONS):
+    """Run every configuration at every minsup, each in its own process so peak RSS is per run."""
+    context = get_context("spawn")
+    runs = []
+    for algorithm, counter in configurations:
+        for min_support in min_supports:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                run = executor.submit(run_case, file_name, algorithm, counter, min_support, min_confidence).result()
+            runs.append(run)
+            print(f"{algorithm}/{counter} minsup {min_support}: {run['wall_time']:.4f} seconds, peak RSS {run['peak_rss_kb']} kB")
+    return runs
+
+def plot_results(results_file):
+    """Draw wall time, peak RSS and candidate counts against minsup from a benchmark JSON file."""
+    # matplotlib is only needed for the plots
+    import matplotlib.pyplot as plt
+
+    with open(results_file) as file:
+        results = json.load(file)
+
+    # Same colors as generate-plots03.py
+    background_color = "#213153"
+    line_colors = ["#aabee4", "#c59b41", "#e4aabe", "#9be4a0"]
+
+    series = {}
+    for run in results["runs"]:
+        series.setdefault(f"{run['algorithm']}/{run['counter']}", []).append(run)
+    metrics = (
+        ("Wall Time (seconds)", lambda run: run["wall_time"]),
+        ("Peak RSS (MB)", lambda run: run["peak_rss_kb"] / 1024),
+        ("Candidates Counted", lambda run: sum(stats.get("generated", 0) for stats in run["levels"].values())),
+    )
+    for label, value in metrics:
+        plt.figure(facecolor=background_color)
+        for color, (name, runs) in zip(line_colors * len(series), series.items()):
+            runs = sorted(runs, key=lambda run: run["minsup"])
+            plt.plot([run["minsup"] for run in runs], [value(run) for run in runs], marker="o", color=color, label=name)
+        plt.xlabel("Minimum Support Count", color="white")
+        plt.ylabel(label, color="white")
+        plt.title(f"{label} vs Minimum Support", color="white")
+        plt.grid(True, linestyle="--", linewidth=0.5, color="gray")
+        plt.legend(edgecolor="white")
+        plt.xticks(color="white")
+        plt.yticks(color="white")
+    plt.show()
+
+if __name__ == "__main__":
+    # The plot subcommand only reads a results file
+    if sys.argv[1:2] == ["plot"]:
+        parser = argparse.ArgumentParser(prog=f"{sys.argv[0]} plot", description="Plot a benchmark results file.")
+        parser.add_argument("results_file", help="JSON file written by a benchmark run")
+        args = parser.parse_args(sys.argv[2:])
+        plot_results(args.results_file)
+        sys.exit()
+
+    parser = argparse.ArgumentParser(description="Benchmark the miners on synthetic IBM-Quest-style baskets.")
+    parser.add_argument("--minsup", type=int, nargs="+", required=True, help="Minimum support counts")
+    parser.add_argument("--minconf", type=float, default=0.8, help="Minimum confidence")
+    parser.add_argument("--transactions", type=int, default=10000, help="Number of transactions")
+    parser.add_argument("--avg-length", type=float, default=10, help="Average basket length")
+    parser.add_argument("--items", type=int, default=1000, help="Size of the item universe")
+    parser.add_argument("--patterns", type=int, default=None, help="Number of potentially frequent patterns (default items / 5)")
+    parser.add_argument("--pattern-length", type=float, default=4, help="Average pattern length")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the generator")
+    parser.add_argument("--algorithms", nargs="+", default=None, metavar="ALGORITHM/COUNTER",
+                        help="Configurations to run, e.g. apriori/trie fpgrowth/trie (default: all)")
+    parser.add_argument("--data-file", default="benchmark-data.txt", help="Where the generated transactions are written")
+    parser.add_argument("--output", default="benchmark.json", help="Results file")
+    args = parser.parse_args()
+
+    configurations = CONFIGURATIONS if args.algorithms is None else [tuple(name.split("/")) for name in args.algorithms]
+    generator = {
+        "transactions": args.transactions,
+        "avg_length": args.avg_length,
+        "items": args.items,
+        "patterns": args.patterns,
+        "pattern_length": args.pattern_length,
+        "seed": args.seed,
+    }
+    write_transactions(
+        generate_quest_transactions(args.transactions, args.avg_length, args.items, args.patterns, args.pattern_length, seed=args.seed),
+        args.data_file,
+    )
+    runs = run_benchmark(args.data_file, args.minsup, args.minconf, configurations)
+
+    with open(args.output, "w") as file:
+        json.dump({"generator": generator, "runs": runs}, file, indent=2)
+    print(f"Wrote {args.output}")
@@ -0,0 +1,118 @@
+"""Columnar binary output of the mining results, one .npy file per column so numpy.load(mmap_mode="r") can map it."""
+from array import array
+import ast
+import json
+import mmap
+import os
+import sys
+
+# Every column file starts with a fixed-size .npy header, rewritten with the final length when the column is closed
+NPY_MAGIC = b"\x93NUMPY\x01\x00"
+NPY_HEADER_SIZE = 128
+
+# .npy dtype of each array typecode the columns use
+DTYPES = {"i": "i4", "q": "i8", "d": "f8"}
+BYTE_ORDER = "<" if sys.byteorder == "little" else ">"
+
+# Elements buffered per column before they are appended to the file
+FLUSH_SIZE = 1 << 16
+
+class ColumnWriter:
+    """Appends values of one type to a one-dimensional .npy file without knowing the final length up front."""
+
+    def __init__(self, file_name, typecode):
+        self.file = open(file_name, "wb")
+        self.typecode = typecode
+        self.buffer = array(typecode)
+        self.length = 0
+        self.file.write(self.header())
+
+    def header(self):
+        header = f"{{'descr': '{BYTE_ORDER}{DTYPES[self.typecode]}', 'fortran_order': False, 'shape': ({self.length},), }}"
+        header = header.ljust(NPY_HEADER_SIZE - len(NPY_MAGIC) - 2 - 1) + "\n"
+        return NPY_MAGIC + len(header).to_bytes(2, "little") + header.encode("latin1")
+
+    def append(self, value):
+        self.buffer.append(value)
+        if len(self.buffer) >= FLUSH_SIZE:
+            self.flush()
+
+    def extend(self, values):
+        self.buffer.extend(values)
+        if len(self.buffer) >= FLUSH_SIZE:
+            self.flush()
+
+    def flush(self):
+        self.buffer.tofile(self.file)
+        self.length += len(self.buffer)
+        self.buffer = array(self.typecode)
+
+    def close(self):
+        self.flush()
+        self.file.seek(0)
+        self.file.write(self.header())
+        self.file.close()
+
+class RaggedColumnWriter:
+    """A column of item id lists stored as <name>_offsets.npy (int64, starts at 0) and <name>_items.npy (int32)."""
+
+    def __init__(self, directory, name):
+        self.offsets = ColumnWriter(os.path.join(directory, f"{name}_offsets.npy"), "q")
+        self.items = ColumnWriter(os.path.join(directory, f"{name}_items.npy"), "i")
+        self.end = 0
+        self.offsets.append(0)
+
+    def append(self, itemset):
+        items = sorted(itemset)
+        self.items.extend(items)
+        self.end += len(items)
+        self.offsets.append(self.end)
+
+    def close(self):
+        self.offsets.close()
+        self.items.close()
+
+class BinaryResultsWriter:
+    """Writes frequent itemsets and rules as columns of a results directory while they are produced.
+
+    Itemsets: itemset_offsets/itemset_items (item ids) and itemset_support. Rules: lhs and rhs in the same ragged
+    layout, rule_support, rule_confidence and rule_lift. meta.json holds the item names the ids refer to.
+    """
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.itemsets = RaggedColumnWriter(directory, "itemset")
+        self.itemset_support = ColumnWriter(os.path.join(directory, "itemset_support.npy"), "q")
+        self.lhs = RaggedColumnWriter(directory, "lhs")
+        self.rhs = RaggedColumnWriter(directory, "rhs")
+        self.rule_support = ColumnWriter(os.path.join(directory, "rule_support.npy"), "q")
+        self.rule_confidence = ColumnWriter(os.path.join(directory, "rule_confidence.npy"), "d")
+        self.rule_lift = ColumnWriter(os.path.join(directory, "rule_lift.npy"), "d")
+
+    def write_itemsets(self, itemsets):
+        for itemset, support_count in itemsets.items():
+            self.itemsets.append(itemset)
+            self.itemset_support.append(support_count)
+
+    def write_rule(self, rule):
+        self.lhs.append(rule.lhs)
+        self.rhs.append(rule.rhs)
+        self.rule_support.append(rule.support_count)
+        self.rule_confidence.append(rule.confidence)
+        self.rule_lift.append(rule.lift)
+
+    def close(self, item_names, num_transactions):
+        for column in (self.itemsets, self.itemset_support, self.lhs, self.rhs, self.rule_support, self.rule_confidence, self.rule_lift):
+            column.close()
+        with open(os.path.join(self.directory, "meta.json"), "w") as file:
+            json.dump({"num_transactions": num_transactions, "item_names": list(item_names)}, file)
+
+def read_column(file_name):
+    """Memory-map a column written by ColumnWriter, returns a memoryview of its values."""
+    with open(file_name, "rb") as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    header_length = int.from_bytes(buffer[len(NPY_MAGIC):len(NPY_MAGIC) + 2], "little")
+    header = ast.literal_eval(buffer[len(NPY_MAGIC) + 2:len(NPY_MAGIC) + 2 + header_length].decode("latin1"))
+    typecode = {dtype: typecode for typecode, dtype in DTYPES.items()}[header["descr"][1:]]
+    return memoryview(buffer)[len(NPY_MAGIC) + 2 + header_length:].cast(typecode)
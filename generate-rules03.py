@@ -1,231 +1,1275 @@
+from collections import namedtuple
 from itertools import chain, combinations
+from bisect import bisect_left
+import heapq
+import json
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 import time
 import argparse
+import resource
+import os
+import sys
+
+from transaction_loader import TransactionStore, TransactionFile, load_transactions, load_cached_transactions, dump_transactions
+from binary_results import BinaryResultsWriter
+
+def longest_transaction(transactions):
+    """Number of items in the longest transaction of a TransactionStore."""
+    offsets = transactions.offsets
+    return max((offsets[tid + 1] - offsets[tid] for tid in range(len(offsets) - 1)), default=0)
+
+# Association rule record shared by all output writers, support and lift are computed once per rule
+Rule = namedtuple("Rule", ["lhs", "rhs", "support_count", "confidence", "lift"])
+
+class ClosedSupportIndex(dict):
+    """Support lookup over closed itemsets, any other frequent itemset gets the support of its closure.
+
+    The closure of an itemset is its smallest closed superset, which is also the closed superset with the
+    highest support, so the support of every frequent itemset is exact. Derived supports are cached.
+    """
+
+    def __init__(self, closed_itemsets):
+        super().__init__(closed_itemsets)
+        self.closed_by_item = {}
+        for itemset, count in closed_itemsets.items():
+            for item in itemset:
+                self.closed_by_item.setdefault(item, []).append((itemset, count))
+
+    def __missing__(self, itemset):
+        # Only closed sets holding the item with the fewest closed sets have to be checked
+        item = min(itemset, key=lambda item: len(self.closed_by_item.get(item, ())))
+        count = max((count for closed, count in self.closed_by_item.get(item, ()) if itemset <= closed), default=0)
+        self[itemset] = count
+        return count
+
+def count_shard_support(offsets_name, items_name, num_offsets, num_items, start, end, candidates, counter):
+    """Worker entry point: count candidate support over transactions [start, end) of a shared store."""
+    offsets_memory = shared_memory.SharedMemory(name=offsets_name)
+    items_memory = shared_memory.SharedMemory(name=items_name)
+    offsets = offsets_memory.buf.cast("i")[:num_offsets]
+    items = items_memory.buf.cast("i")[:num_items]
+    try:
+        shard = (items[offsets[tid]:offsets[tid + 1]] for tid in range(start, end))
+        candidate_counts = Apriori(0, 0, counter).count_support(candidates, shard)
+        return [candidate_counts[candidate] for candidate in candidates]
+    finally:
+        # The views have to be released before the blocks can be closed
+        shard = None
+        offsets.release()
+        items.release()
+        offsets_memory.close()
+        items_memory.close()
+
+class SharedTransactionShards:
+    """Publishes a TransactionStore in shared memory and counts candidate support in a process pool.
+
+    The store is split into one shard per worker with about the same number of items, workers attach
+    to the shared blocks, so only the candidates and the per-shard counts are pickled.
+    """
+
+    def __init__(self, transactions, workers, counter):
+        self.counter = counter
+        self.num_offsets = len(transactions.offsets)
+        self.num_items = len(transactions.items)
+        self.offsets_memory = self.share(transactions.offsets)
+        self.items_memory = self.share(transactions.items)
+
+        # Shard boundaries are placed so that every worker gets about the same number of items
+        boundaries = [0]
+        for worker in range(1, workers):
+            boundaries.append(bisect_left(transactions.offsets, self.num_items * worker // workers))
+        boundaries.append(len(transactions))
+        self.shards = [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+
+    @staticmethod
+    def share(values):
+        """Copy an int32 array into a new shared memory block."""
+        memory = shared_memory.SharedMemory(create=True, size=max(1, len(values) * values.itemsize))
+        memory.buf[:len(values) * values.itemsize] = memoryview(values).cast("B")
+        return memory
+
+    def count_support(self, candidates):
+        """Count candidate support on every shard in parallel and reduce the counts."""
+        if not candidates:
+            return {}
+        futures = [
+            self.executor.submit(count_shard_support, self.offsets_memory.name, self.items_memory.name,
+                                 self.num_offsets, self.num_items, start, end, candidates, self.counter)
+            for start, end in self.shards
+        ]
+        counts = [0] * len(candidates)
+        for future in futures:
+            for index, count in enumerate(future.result()):
+                counts[index] += count
+        return dict(zip(candidates, counts))
+
+    def close(self):
+        """Stop the workers and free the shared memory blocks."""
+        self.executor.shutdown()
+        for memory in (self.offsets_memory, self.items_memory):
+            memory.close()
+            memory.unlink()
 
 class Apriori:
+    # Available support counting engines, "naive" is kept as the reference implementation
+    COUNTING_ENGINES = ("naive", "trie")
+    # Horizontal mode scans the transactions level by level, vertical mode intersects per-item tid bitsets
+    MINING_MODES = ("horizontal", "vertical")
+    # Rule engines, "enumerate" tries every subset as LHS and "apgenrules" grows consequents with confidence pruning
+    RULE_ENGINES = ("enumerate", "apgenrules")
+    # Rule measures run_top_k can rank by, only "support" lets the support threshold rise during the search
+    TOP_K_ORDERS = ("confidence", "lift", "support")
+    # Frequent itemsets kept by the search, "closed" and "maximal" prune the others while searching
+    OUTPUT_MODES = ("all", "closed", "maximal")
+
     # Initializing all needed attributes for the output files and requirements
-    def __init__(self, min_support, min_confidence):
+    def __init__(self, min_support, min_confidence, counter="trie", mode="horizontal", workers=1, rule_engine="apgenrules",
+                 output="all"):
+        if counter not in self.COUNTING_ENGINES:
+            raise ValueError(f"Unknown counting engine '{counter}', expected one of {self.COUNTING_ENGINES}")
+        if mode not in self.MINING_MODES:
+            raise ValueError(f"Unknown mining mode '{mode}', expected one of {self.MINING_MODES}")
+        if rule_engine not in self.RULE_ENGINES:
+            raise ValueError(f"Unknown rule engine '{rule_engine}', expected one of {self.RULE_ENGINES}")
+        if output not in self.OUTPUT_MODES:
+            raise ValueError(f"Unknown output mode '{output}', expected one of {self.OUTPUT_MODES}")
         self.min_support = min_support
         self.min_confidence = min_confidence
+        self.counter = counter
+        self.mode = mode
+        self.workers = workers
+        self.rule_engine = rule_engine
+        self.output = output
         self.frequent_itemsets = {}
         self.association_rules = []
         self.frequent_itemsets_time = 0
         self.association_rules_time = 0
+        # Per-level metrics: candidates generated and pruned, frequent itemsets found, counting time and peak RSS
+        self.level_stats = {}
+        # Optional hook, called as on_level(k, stats) every time a level is recorded
+        self.on_level = None
+        # Optional callable that receives every rule instead of association_rules, so rules can be written as they are found
+        self.rule_sink = None
+        self.item_names = []
+        self.item_index = {}
+        self.support_index = {}
+        self.num_transactions = 0
+        self.max_transaction_length = 0
+        # Infrequent itemsets whose subsets are all frequent, grouped by length like frequent_itemsets, kept for update()
+        self.negative_border = None
+        # Stores the current counts were taken from, update() rescans them for itemsets it has no count of
+        self.history = []
     
+    @staticmethod
+    def prefix_join(itemsets):
+        """Join sorted tuples of equal length that share all but their last item.
+
+        A joined tuple is kept only when every one of its sub-tuples one item shorter is among the inputs
+        (downward closure). Returns the kept tuples in sorted order and the number of pruned ones.
+        """
+        joined = []
+        pruned = 0
+        itemsets_list = sorted(itemsets)
+        known = set(itemsets_list)
+
+        # Walk the sorted itemsets one block of shared prefix at a time
+        start = 0
+        while start < len(itemsets_list):
+            prefix = itemsets_list[start][:-1]
+            end = start + 1
+            while end < len(itemsets_list) and itemsets_list[end][:-1] == prefix:
+                end += 1
+
+            # Join every pair inside the block, the result stays in sorted order
+            for i in range(start, end):
+                for j in range(i + 1, end):
+                    candidate = itemsets_list[i] + itemsets_list[j][-1:]
+
+                    # Subset Pruning: dropping one of the last two items gives back the joined tuples, so skip those
+                    if all(candidate[:m] + candidate[m + 1:] in known for m in range(len(candidate) - 2)):
+                        joined.append(candidate)
+                    else:
+                        pruned += 1
+            start = end
+        return joined, pruned
+
     def generate_candidates(self, itemsets, length):
-        """Generate candidate itemsets of given length."""
-        candidates = set()
-        itemsets_list = list(itemsets)
-
-        # Iterate through each pair of itemsets
-        for i in range(len(itemsets_list)):
-            for j in range(i + 1, len(itemsets_list)):
-                # Merge two itemsets using set union to create a new candidate
-                candidate = itemsets_list[i] | itemsets_list[j]
-                # Check the created candidate has the desired length and add it to the candidates set
-                if len(candidate) == length:
-                    candidates.add(candidate)
+        """Generate candidate itemsets of given length from the sorted frequent (length-1)-tuples."""
+        # Every (length-1)-subset of a candidate must be frequent, itemsets is exactly frequent_itemsets[length - 1]
+        candidates, pruned = self.prefix_join(itemsets)
+
+        # Record how many candidates were generated and pruned at this level
+        self.level_stats[length] = {"generated": len(candidates), "pruned": pruned}
         return candidates
+
+    def record_level(self, k, **stats):
+        """Add metrics to level k, stamp the peak RSS so far (kilobytes) and pass the level to the on_level hook."""
+        level = self.level_stats.setdefault(k, {})
+        level.update(stats)
+        level["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if self.on_level is not None:
+            self.on_level(k, level)
     
+    def count_support(self, candidates, transactions):
+        """Count the support of candidate tuples with the configured counting engine."""
+        return getattr(self, f"count_support_{self.counter}")(candidates, transactions)
+
+    def count_support_naive(self, candidates, transactions):
+        """Reference counter: test every candidate against every transaction."""
+        candidate_sets = {candidate: frozenset(candidate) for candidate in candidates}
+        candidate_counts = {candidate: 0 for candidate in candidates}
+
+        for transaction in transactions:
+            transaction = set(transaction)
+            for candidate, candidate_set in candidate_sets.items():
+                if candidate_set.issubset(transaction):
+                    candidate_counts[candidate] += 1
+        return candidate_counts
+
+    def count_support_trie(self, candidates, transactions):
+        """Count support by walking each transaction through a prefix trie of the candidates."""
+        if not candidates:
+            return {}
+        length = len(candidates[0])
+        counts = [0] * len(candidates)
+
+        # Build the trie, inner nodes map an item to the next node and the last level maps to a count slot
+        root = {}
+        for index, candidate in enumerate(candidates):
+            node = root
+            for item in candidate[:-1]:
+                node = node.setdefault(item, {})
+            node[candidate[-1]] = index
+
+        def walk(node, items, start, remaining):
+            # Only positions that still leave enough items for the rest of the candidate are tried
+            for i in range(start, len(items) - remaining + 1):
+                child = node.get(items[i])
+                if child is None:
+                    continue
+                if remaining == 1:
+                    counts[child] += 1
+                else:
+                    walk(child, items, i + 1, remaining - 1)
+
+        # Candidates and transactions are both sorted, so each transaction is reduced to the items that appear in a candidate
+        candidate_items = set(item for candidate in candidates for item in candidate)
+        for transaction in transactions:
+            items = [item for item in transaction if item in candidate_items]
+            if len(items) >= length:
+                walk(root, items, 0, length)
+
+        return dict(zip(candidates, counts))
+
+    def build_tid_bitsets(self, transactions):
+        """Build one tid bitset per item (bit t is set when transaction t holds the item) in a single pass."""
+        tid_lists = {}
+        for tid, transaction in enumerate(transactions):
+            for item in transaction:
+                tid_lists.setdefault(item, []).append(tid)
+
+        # Set the bits in a byte buffer first, growing a Python int bit by bit would be quadratic
+        bitsets = {}
+        for item, tids in tid_lists.items():
+            buffer = bytearray(tids[-1] // 8 + 1)
+            for tid in tids:
+                buffer[tid >> 3] |= 1 << (tid & 7)
+            bitsets[item] = int.from_bytes(buffer, "little")
+        return bitsets
+
+    def frequent_item_bitsets(self, transactions):
+        """(1-itemset, tid bitset) pairs of the frequent items in ascending support, the start of the closed and maximal searches."""
+        bitsets = self.build_tid_bitsets(transactions)
+        nodes = [(frozenset([item]), bits) for item, bits in bitsets.items() if bits.bit_count() >= self.min_support]
+        nodes.sort(key=lambda node: (node[1].bit_count(), min(node[0])))
+        return nodes
+
+    def store_levels(self, levels, extra_stats=None):
+        """Store the (sorted tuple, count) pairs a depth-first search found per length and record every level.
+
+        Levels are kept in sorted order, the same order the horizontal mode produces. extra_stats holds further
+        per-level metrics, such as the intersections tried, and may name lengths without frequent itemsets.
+        """
+        extra_stats = extra_stats or {}
+        for k in sorted(set(levels) | set(extra_stats)):
+            if k in levels:
+                self.frequent_itemsets[k] = {frozenset(itemset): count for itemset, count in sorted(levels[k])}
+            self.record_level(k, **extra_stats.get(k, {}), frequent=len(levels.get(k, ())))
+
+    def get_frequent_itemsets_vertical(self, transactions):
+        """Find all frequent itemsets with Eclat-style depth-first tid bitset intersections."""
+
+        # start time
+        start_time = time.perf_counter()
+
+        # Keep only frequent items, the 1-itemsets follow the order in which items first appear
+        bitsets = self.build_tid_bitsets(transactions)
+        self.frequent_itemsets[1] = {}
+        extensions = []
+        for item, bits in bitsets.items():
+            count = bits.bit_count()
+            if count >= self.min_support:
+                self.frequent_itemsets[1][frozenset([item])] = count
+                extensions.append((item, bits))
+        extensions.sort(key=lambda extension: extension[0])
+        self.record_level(1, generated=len(bitsets), pruned=0, frequent=len(extensions),
+                          counting_time=time.perf_counter() - start_time)
+
+        # Frequent k-itemsets (k >= 2) found by the search, grouped by length, and the intersections tried per length.
+        # The search is depth-first, so the levels have no counting time of their own
+        levels = {}
+        intersections = {}
+
+        def extend(prefix, extensions):
+            # Every extension is frequent together with the prefix, join it with each later extension
+            for i, (item, bits) in enumerate(extensions):
+                itemset = prefix + (item,)
+                intersections[len(itemset) + 1] = intersections.get(len(itemset) + 1, 0) + len(extensions) - i - 1
+                children = []
+                for other_item, other_bits in extensions[i + 1:]:
+                    joined = bits & other_bits
+                    count = joined.bit_count()
+                    if count >= self.min_support:
+                        levels.setdefault(len(itemset) + 1, []).append((itemset + (other_item,), count))
+                        children.append((other_item, joined))
+                if children:
+                    extend(itemset, children)
+
+        extend((), extensions)
+
+        self.store_levels(levels, {k: {"generated": count, "pruned": 0} for k, count in intersections.items()})
+
+        # end time
+        end_time = time.perf_counter()
+
+        self.frequent_itemsets_time = end_time - start_time
+
+    def get_frequent_itemsets_closed(self, transactions):
+        """Find the closed frequent itemsets with a CHARM search over tid bitsets.
+
+        Two itemsets with the same tid bitset have the same closure, so joins that do not shrink the bitset
+        merge the itemsets instead of opening a branch, and the non-closed itemsets are never enumerated.
+        """
+
+        # start time
+        start_time = time.perf_counter()
+
+        # Closed itemsets keyed by tid bitset, itemsets with the same bitset are merged into their closure
+        closed = {}
+
+        def extend(prefix, nodes):
+            # nodes are [extension, bits] pairs in ascending support, an extension is removed by setting it to None
+            for i in range(len(nodes)):
+                if nodes[i] is None:
+                    continue
+                itemset, bits = nodes[i]
+                itemset = prefix | itemset
+                children = []
+                for j in range(i + 1, len(nodes)):
+                    if nodes[j] is None:
+                        continue
+                    other, other_bits = nodes[j]
+                    joined = bits & other_bits
+                    if joined.bit_count() < self.min_support:
+                        continue
+                    if joined == bits:
+                        # Every transaction with the itemset also holds the other extension, it belongs to the closure
+                        itemset = itemset | other
+                        if joined == other_bits:
+                            nodes[j] = None
+                    else:
+                        if joined == other_bits:
+                            nodes[j] = None
+                        children.append([other, joined])
+
+                if children:
+                    children.sort(key=lambda child: child[1].bit_count())
+                    extend(itemset, children)
+                closed[bits] = closed.get(bits, frozenset()) | itemset
+
+        extend(frozenset(), self.frequent_item_bitsets(transactions))
+
+        levels = {}
+        for bits, itemset in closed.items():
+            levels.setdefault(len(itemset), []).append((tuple(sorted(itemset)), bits.bit_count()))
+        self.store_levels(levels)
+
+        # end time
+        end_time = time.perf_counter()
+
+        self.frequent_itemsets_time = end_time - start_time
+
+    def get_frequent_itemsets_maximal(self, transactions):
+        """Find the maximal frequent itemsets with a depth-first tid bitset search and MaxMiner lookahead.
+
+        A branch whose prefix together with all its remaining extensions is frequent, or is contained in a
+        maximal itemset found before, is not searched any further.
+        """
+
+        # start time
+        start_time = time.perf_counter()
+        maximal = []
+
+        def subsumed(itemset):
+            return any(itemset <= found for found, _ in maximal)
+
+        def extend(prefix, nodes):
+            # Lookahead: if the prefix with every extension is frequent nothing below it can be maximal
+            head = prefix.union(*(node[0] for node in nodes))
+            head_bits = nodes[0][1]
+            for _, bits in nodes[1:]:
+                head_bits &= bits
+            if head_bits.bit_count() >= self.min_support:
+                if not subsumed(head):
+                    maximal.append((head, head_bits.bit_count()))
+                return
+
+            for i, (extension, bits) in enumerate(nodes):
+                itemset = prefix | extension
+                if subsumed(itemset.union(*(node[0] for node in nodes[i + 1:]))):
+                    continue
+                children = []
+                for other, other_bits in nodes[i + 1:]:
+                    joined = bits & other_bits
+                    if joined.bit_count() >= self.min_support:
+                        children.append((other, joined))
+                if children:
+                    children.sort(key=lambda child: child[1].bit_count())
+                    extend(itemset, children)
+                elif not subsumed(itemset):
+                    maximal.append((itemset, bits.bit_count()))
+
+        nodes = self.frequent_item_bitsets(transactions)
+        if nodes:
+            extend(frozenset(), nodes)
+
+        levels = {}
+        for itemset, count in maximal:
+            levels.setdefault(len(itemset), []).append((tuple(sorted(itemset)), count))
+        self.store_levels(levels)
+
+        # end time
+        end_time = time.perf_counter()
+
+        self.frequent_itemsets_time = end_time - start_time
+
     def get_frequent_itemsets(self, transactions):
         """Find all frequent itemsets that meet the minimum support."""
+        if self.output != "all":
+            return getattr(self, f"get_frequent_itemsets_{self.output}")(transactions)
+        if self.mode == "vertical":
+            return self.get_frequent_itemsets_vertical(transactions)
 
         # start time
-        start_time = time.time()
+        start_time = time.perf_counter()
 
-        # Dictionary to store individual item support counts
-        item_counts = {}
-        
-        # Count support for individual items
-        for transaction in transactions:
-            for item in transaction:
-                # Increment item count
-                item_counts[frozenset([item])] = item_counts.get(frozenset([item]), 0) + 1
+        # Individual item support counts indexed by dense item id, counted from the flat item array or read from the cache
+        item_counts = transactions.count_items()
+        counting_time = time.perf_counter() - start_time
 
         # Candidate Pruning: Filter out infrequent items based on the min support count threshold
         self.frequent_itemsets[1] = {}  # Initialize an empty dictionary for 1-item frequent itemsets
+        self.negative_border = {1: {}}
 
         # Iterate through all item counts
-        for item, count in item_counts.items():
+        for item, count in enumerate(item_counts):
             # Check if the item's support count meets or exceeds the minimum support threshold
             if count >= self.min_support:
                 # Add the itemset to the frequent itemsets dictionary
-                self.frequent_itemsets[1][item] = count
+                self.frequent_itemsets[1][frozenset([item])] = count
+            else:
+                self.negative_border[1][frozenset([item])] = count
+        self.record_level(1, generated=len(item_counts), pruned=0, frequent=len(self.frequent_itemsets[1]), counting_time=counting_time)
         
-        # Generate frequent itemsets of increasing length
+        # Generate frequent itemsets of increasing length, itemsets are kept as sorted tuples
         k = 2
-        current_itemsets = set(self.frequent_itemsets[1].keys())
+        current_itemsets = [tuple(itemset) for itemset in self.frequent_itemsets[1]]
 
-        # Keep generating frequent itemsets until done
-        while current_itemsets:
-            # Generate candidate k-itemsets from (k-1)-itemsets
-            candidates = self.generate_candidates(current_itemsets, k)
+        # With several workers the transactions are published once in shared memory for all levels
+        shards = SharedTransactionShards(transactions, self.workers, self.counter) if self.workers > 1 else None
 
-            # Initialize candidate counts for all generated candidates
-            candidate_counts = {c: 0 for c in candidates}
-            
-            # Count support for candidates
-            for transaction in transactions:
-                for candidate in candidates:
-                    if candidate.issubset(transaction):
-                        candidate_counts[candidate] += 1
+        try:
+            # Keep generating frequent itemsets until done
+            while current_itemsets:
+                # Generate candidate k-itemsets from (k-1)-itemsets
+                candidates = self.generate_candidates(current_itemsets, k)
 
-            # Filter by minimum support count and store frequent k-itemsets
-            self.frequent_itemsets[k] = {}  # Initialize an empty dictionary for k-item frequent itemsets
+                # Count support for candidates with the selected counting engine, split across the workers if any
+                counting_start_time = time.perf_counter()
+                if shards is not None:
+                    candidate_counts = shards.count_support(candidates)
+                else:
+                    candidate_counts = self.count_support(candidates, transactions)
+                counting_time = time.perf_counter() - counting_start_time
 
-            # Iterate through all candidate itemsets and their counts
-            for itemset, count in candidate_counts.items():
-            # Check if the item's support count meets or exceeds the minimum support threshold
-                if count >= self.min_support:
-                    # Add the itemset to the frequent itemsets dictionary
-                    self.frequent_itemsets[k][itemset] = count
+                # Filter by minimum support count and store frequent k-itemsets, the others form the negative border
+                self.frequent_itemsets[k] = {}  # Initialize an empty dictionary for k-item frequent itemsets
+                self.negative_border[k] = {}
+                next_itemsets = []
+
+                # Iterate through all candidate itemsets and their counts
+                for itemset, count in candidate_counts.items():
+                # Check if the item's support count meets or exceeds the minimum support threshold
+                    if count >= self.min_support:
+                        # Add the itemset to the frequent itemsets dictionary
+                        self.frequent_itemsets[k][frozenset(itemset)] = count
+                        next_itemsets.append(itemset)
+                    else:
+                        self.negative_border[k][frozenset(itemset)] = count
+                self.record_level(k, frequent=len(self.frequent_itemsets[k]), counting_time=counting_time)
 
             
-            # If no frequent itemsets of size k, delete the entry of size 'k' and stop the process
-            if not self.frequent_itemsets[k]:
-                del self.frequent_itemsets[k]
-                break
+                # If no frequent itemsets of size k, delete the entry of size 'k' and stop the process
+                if not self.frequent_itemsets[k]:
+                    del self.frequent_itemsets[k]
+                    break
             
-            # Move to the next level
-            current_itemsets = set(self.frequent_itemsets[k].keys())
-            k += 1
+                # Move to the next level
+                current_itemsets = next_itemsets
+                k += 1
+        finally:
+            if shards is not None:
+                shards.close()
 
         # end time
-        end_time = time.time()
+        end_time = time.perf_counter()
 
         self.frequent_itemsets_time = end_time - start_time
     
+    def build_support_index(self):
+        """Flatten the frequent itemsets of every level into one itemset -> support count lookup."""
+        self.support_index = {}
+        for itemsets in self.frequent_itemsets.values():
+            self.support_index.update(itemsets)
+        # Closed itemsets determine the support of every frequent itemset
+        if self.output == "closed":
+            self.support_index = ClosedSupportIndex(self.support_index)
+
+    def add_rule(self, lhs, rhs, support_count, lhs_support):
+        """Append the rule LHS -> RHS if its confidence meets the threshold, return whether it did."""
+        # Compute confidence: S(itemset) / S(lhs), compared unrounded so rounding never changes the result
+        confidence = support_count / lhs_support
+        if confidence < self.min_confidence:
+            return False
+
+        # Lift = P(LHS, RHS) / (P(LHS) * P(RHS)) = S(itemset) * N / (S(lhs) * S(rhs))
+        lift = support_count * self.num_transactions / (lhs_support * self.support_index[rhs])
+        rule = Rule(lhs, rhs, support_count, confidence, lift)
+        if self.rule_sink is not None:
+            self.rule_sink(rule)
+        else:
+            self.association_rules.append(rule)
+        return True
+
+    def generate_rules_enumerate(self, itemset, support_count):
+        """Reference rule engine: try every non-empty proper subset of the itemset as LHS."""
+        for lhs in chain.from_iterable(combinations(itemset, r) for r in range(1, len(itemset))):
+            lhs = frozenset(lhs)
+            self.add_rule(lhs, itemset - lhs, support_count, self.support_index[lhs])
+
+    def generate_rules_apgenrules(self, itemset, support_count):
+        """ap-genrules: grow consequents one item at a time, only from consequents that gave confident rules.
+
+        Moving an item from the LHS to the RHS can only lower the confidence, so a consequent is extended
+        only when all its one-smaller sub-consequents were confident.
+        """
+        consequents = [(item,) for item in sorted(itemset)]
+        while consequents:
+            confident = []
+            for consequent in consequents:
+                rhs = frozenset(consequent)
+                lhs = itemset - rhs
+                if self.add_rule(lhs, rhs, support_count, self.support_index[lhs]):
+                    confident.append(consequent)
+
+            # The LHS has to keep at least one item
+            if len(consequents[0]) + 1 >= len(itemset):
+                break
+            consequents, _ = self.prefix_join(confident)
+
     def generate_association_rules(self):
         """Generate association rules that meet the minimum confidence."""
     
         # Start time
-        start_time = time.time()
+        start_time = time.perf_counter()
+        self.build_support_index()
+        generate_rules = getattr(self, f"generate_rules_{self.rule_engine}")
     
-        # Iterate through all frequent itemsets
+        # Iterate through all frequent itemsets, in closed mode these are the rules whose itemset is closed.
+        # Maximal itemsets do not give the support of their subsets, so there are no exact rules to generate
         for k, itemsets in self.frequent_itemsets.items():
             # Skip frequent itemsets of length 1
-            if k < 2:
+            if k < 2 or self.output == "maximal":
                 continue
 
             # Iterate over each frequent itemset and its support count
             for itemset, support_count in itemsets.items():
-                # Generate all non-empty proper subsets of itemset
-                for lhs in chain.from_iterable(combinations(itemset, r) for r in range(1, len(itemset))):
-                    # LHS
-                    lhs = frozenset(lhs)
-                    # RHS
-                    rhs = itemset - lhs
-                
-                    # Ensuring the RHS is not empty
-                    if rhs:
-                        # Get support count of LHS
-                        lhs_support = self.frequent_itemsets[len(lhs)].get(lhs, 0)
-
-                        # Compute confidence: S(itemset) / S(lhs)
-                        confidence = support_count / lhs_support if lhs_support else 0
-                        confidence = round(confidence, 3)
-                        
-                        # Add rule if confidence meets the threshold 
-                        if confidence >= self.min_confidence:
-                            self.association_rules.append((lhs, rhs, confidence))
+                generate_rules(itemset, support_count)
 
         # End time
-        end_time = time.time()
+        end_time = time.perf_counter()
         self.association_rules_time = end_time - start_time
     
+    def decode_itemset(self, itemset):
+        """Map an itemset of dense item ids back to a frozenset of item names."""
+        return frozenset(self.item_names[item] for item in itemset)
+
     def print_association_rules(self):
         """Print association rules in an understandable format."""
-        formatted_rules = [(set(lhs), set(rhs), confidence) for lhs, rhs, confidence in self.association_rules]
+        formatted_rules = [(set(self.decode_itemset(lhs)), set(self.decode_itemset(rhs)), confidence) for lhs, rhs, _, confidence, _ in self.association_rules]
         print("Association Rules:", [f"({lhs} --> {rhs}, {conf:.1f})" for lhs, rhs, conf in formatted_rules])
 
+    def generate_top_k_rules(self, k, order):
+        """Keep the k confident rules with the highest order value (confidence or lift), best first.
+
+        Rules go through a bounded heap instead of association_rules. When ranking by confidence, min_confidence is
+        raised to the weakest kept confidence once the heap is full, which also stops ap-genrules from growing
+        consequents that can no longer enter it. Lift is not monotone in the consequent, so it only filters.
+        """
+        heap = []
+        pushed = 0
+        rule_sink = self.rule_sink
+
+        def keep(rule):
+            nonlocal pushed
+            # Ties go to the higher support, the counter makes sure rules themselves are never compared
+            entry = (getattr(rule, order), rule.support_count, pushed, rule)
+            pushed += 1
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+            if len(heap) == k and order == "confidence":
+                self.min_confidence = max(self.min_confidence, heap[0][0])
+
+        self.rule_sink = keep
+        try:
+            self.generate_association_rules()
+        finally:
+            self.rule_sink = rule_sink
+        self.association_rules = [entry[3] for entry in sorted(heap, reverse=True)]
+
+    def get_top_k_rules_by_support(self, transactions, k):
+        """Level-wise search for the k confident rules with the highest support, raising min_support as the heap fills.
+
+        A rule has the support of its itemset and every superset has at most that support, so once the heap holds
+        k rules no itemset below the weakest of them can contribute. Rules are generated as soon as a batch of
+        itemsets is counted, parents are joined best first in doubling batches and a level stops once the next
+        parent is below the raised threshold. min_support is the floor and ends at the support of the weakest rule.
+        """
+
+        # start time
+        start_time = time.perf_counter()
+        generate_rules = getattr(self, f"generate_rules_{self.rule_engine}")
+        heap = []
+        pushed = 0
+        self.association_rules_time = 0
+
+        def keep(rule):
+            nonlocal pushed
+            # Ties go to the higher confidence, the counter makes sure rules themselves are never compared
+            entry = (rule.support_count, rule.confidence, pushed, rule)
+            pushed += 1
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+
+        def collect(itemsets):
+            # Strongest itemsets first, so the threshold rises as early as possible
+            rules_start_time = time.perf_counter()
+            for itemset, support_count in sorted(itemsets.items(), key=lambda entry: -entry[1]):
+                if support_count < self.min_support:
+                    break
+                generate_rules(itemset, support_count)
+                if len(heap) == k:
+                    self.min_support = max(self.min_support, heap[0][0])
+            self.association_rules_time += time.perf_counter() - rules_start_time
+
+        # Level 1 is counted at the floor, single items give no rules
+        item_counts = transactions.count_items()
+        self.frequent_itemsets[1] = {frozenset([item]): count for item, count in enumerate(item_counts) if count >= self.min_support}
+        self.record_level(1, generated=len(item_counts), pruned=0, frequent=len(self.frequent_itemsets[1]),
+                          counting_time=time.perf_counter() - start_time)
+        self.support_index = dict(self.frequent_itemsets[1])
+        current_itemsets = {tuple(itemset): count for itemset, count in self.frequent_itemsets[1].items()}
+
+        rule_sink = self.rule_sink
+        self.rule_sink = keep
+        try:
+            length = 2
+            while current_itemsets:
+                ranked = sorted(current_itemsets, key=lambda itemset: -current_itemsets[itemset])
+                counted = set()
+                level = {}
+                counting_time = 0
+                size = 2
+                while True:
+                    # A candidate has at most the support of its weakest parent. The join of the last batch covers
+                    # every parent, so its pruned count is the one of the level
+                    joined, pruned = self.prefix_join(ranked[:size])
+                    candidates = [candidate for candidate in joined if candidate not in counted]
+                    counted.update(candidates)
+
+                    counting_start_time = time.perf_counter()
+                    found = {
+                        frozenset(itemset): count
+                        for itemset, count in self.count_support(candidates, transactions).items()
+                        if count >= self.min_support
+                    }
+                    counting_time += time.perf_counter() - counting_start_time
+                    level.update(found)
+                    self.support_index.update(found)
+                    collect(found)
+                    if size >= len(ranked) or current_itemsets[ranked[size]] < self.min_support:
+                        break
+                    size *= 2
+
+                self.frequent_itemsets[length] = level
+                self.record_level(length, generated=len(counted), pruned=pruned, frequent=len(level), counting_time=counting_time)
+                if not level:
+                    del self.frequent_itemsets[length]
+                    break
+
+                # Only itemsets that still reach the raised threshold are extended
+                current_itemsets = {tuple(sorted(itemset)): count for itemset, count in level.items() if count >= self.min_support}
+                length += 1
+        finally:
+            self.rule_sink = rule_sink
+
+        # Keep what is frequent at the final threshold, level 1 stays even when empty like in the other modes
+        for length in list(self.frequent_itemsets):
+            self.frequent_itemsets[length] = {
+                itemset: count for itemset, count in self.frequent_itemsets[length].items() if count >= self.min_support
+            }
+            if length > 1 and not self.frequent_itemsets[length]:
+                del self.frequent_itemsets[length]
+        self.association_rules = [entry[3] for entry in sorted(heap, reverse=True)]
+
+        # end time, the rule generation interleaved with the search is reported separately
+        end_time = time.perf_counter()
+        self.frequent_itemsets_time = end_time - start_time - self.association_rules_time
+
+    def run_top_k(self, transactions, k, order="confidence"):
+        """Return only the k best rules by order.
+
+        By support, the level-wise search raises min_support as the rules come in. Confidence and lift have no
+        such bound (a rule of support 1 can have confidence 1), so for them every itemset is mined at min_support.
+        """
+        if k < 1:
+            raise ValueError(f"k must be at least 1, got {k}")
+        if order not in self.TOP_K_ORDERS:
+            raise ValueError(f"Unknown top-k order '{order}', expected one of {self.TOP_K_ORDERS}")
+        transactions = self.prepare(transactions)
+        if order == "support":
+            self.get_top_k_rules_by_support(transactions, k)
+        else:
+            self.get_frequent_itemsets(transactions)
+            self.generate_top_k_rules(k, order)
+        return self.frequent_itemsets, self.association_rules, self.frequent_itemsets_time, self.association_rules_time
+
+    def count_history(self, candidates, history):
+        """Count candidate support summed over several TransactionStores."""
+        candidate_counts = dict.fromkeys(candidates, 0)
+        for transactions in history:
+            for candidate, count in self.count_support(candidates, transactions).items():
+                candidate_counts[candidate] += count
+        return candidate_counts
+
+    def build_negative_border(self, history):
+        """Count the negative border of the current frequent itemsets on history, for miners that do not record it."""
+        item_counts = [0] * len(self.item_index)
+        for transactions in history:
+            for item, count in enumerate(transactions.count_items()):
+                item_counts[item] += count
+        self.negative_border = {1: {frozenset([item]): count for item, count in enumerate(item_counts) if count < self.min_support}}
+
+        for k in sorted(self.frequent_itemsets):
+            candidates, _ = self.prefix_join(tuple(sorted(itemset)) for itemset in self.frequent_itemsets[k])
+            candidates = [candidate for candidate in candidates if frozenset(candidate) not in self.frequent_itemsets.get(k + 1, {})]
+            self.negative_border[k + 1] = {frozenset(itemset): count for itemset, count in self.count_history(candidates, history).items()}
+
+    def update(self, new_transactions, history=None):
+        """Add a batch of transactions to a finished run, FUP style, and update the results in place.
+
+        Counts only grow, so every itemset stays frequent. Itemsets with a count (the frequent ones and the negative
+        border) are recounted on the batch alone. Any other candidate is bounded by its subsets' counts before the
+        batch, and only the ones that could still reach min_support are counted on the history.
+        history lists the TransactionStores of the earlier runs, encoded with this miner's item_index, and defaults
+        to the ones seen in this process. It is only scanned when such a candidate exists.
+        """
+        if self.output != "all":
+            raise ValueError("Only runs with output 'all' can be updated")
+
+        # start time
+        start_time = time.perf_counter()
+        history = self.history if history is None else history
+        if self.negative_border is None:
+            if not history:
+                raise ValueError("The negative border is unknown, update() needs the previous transactions")
+            self.build_negative_border(history)
+
+        # The batch is encoded with the same item ids, new items are appended to the index
+        if not isinstance(new_transactions, TransactionStore):
+            new_transactions = TransactionStore.from_transactions(new_transactions, self.item_index)
+        self.item_names = [str(item) for item in self.item_index]
+
+        # Counts before the batch of every itemset that has one, items that never occurred have a count of 0
+        old_counts = {}
+        for levels in (self.frequent_itemsets, self.negative_border):
+            for itemsets in levels.values():
+                old_counts.update((tuple(sorted(itemset)), count) for itemset, count in itemsets.items())
+        item_counts = new_transactions.count_items()
+        for item in range(len(item_counts)):
+            old_counts.setdefault((item,), 0)
+
+        # Batch counts of the itemsets with a count, level by level
+        batch_counts = {(item,): count for item, count in enumerate(item_counts)}
+        known_by_length = {}
+        for itemset in old_counts:
+            if len(itemset) > 1:
+                known_by_length.setdefault(len(itemset), []).append(itemset)
+        for itemsets in known_by_length.values():
+            batch_counts.update(self.count_support(itemsets, new_transactions))
+
+        # Rebuild the levels from the new counts, starting with every item
+        self.frequent_itemsets = {}
+        self.negative_border = {}
+        candidates = [(item,) for item in range(len(item_counts))]
+        k = 1
+        while candidates:
+            unknown = [candidate for candidate in candidates if candidate not in old_counts]
+            if unknown:
+                # Count the unknown candidates on the batch, those that can still become frequent on the history too
+                batch_counts.update(self.count_support(unknown, new_transactions))
+                rescan = [
+                    candidate for candidate in unknown
+                    if min(old_counts[candidate[:m] + candidate[m + 1:]] for m in range(k)) + batch_counts[candidate] >= self.min_support
+                ]
+                if rescan:
+                    if not history:
+                        raise ValueError("New candidates have to be counted on the previous transactions, pass them as history")
+                    old_counts.update(self.count_history(rescan, history))
+
+            # Candidates without an exact count are infrequent and are left out of the border
+            self.frequent_itemsets[k] = {}
+            self.negative_border[k] = {}
+            for candidate in candidates:
+                if candidate not in old_counts:
+                    continue
+                count = old_counts[candidate] + batch_counts[candidate]
+                if count >= self.min_support:
+                    self.frequent_itemsets[k][frozenset(candidate)] = count
+                else:
+                    self.negative_border[k][frozenset(candidate)] = count
+            # Level 1 stays even when empty, like in get_frequent_itemsets
+            if not self.frequent_itemsets[k]:
+                if k > 1:
+                    del self.frequent_itemsets[k]
+                break
+            candidates, _ = self.prefix_join(tuple(sorted(itemset)) for itemset in self.frequent_itemsets[k])
+            k += 1
+
+        self.num_transactions += len(new_transactions)
+        self.max_transaction_length = max(self.max_transaction_length, longest_transaction(new_transactions))
+        self.history = [*history, new_transactions]
+
+        # end time
+        end_time = time.perf_counter()
+        self.frequent_itemsets_time = end_time - start_time
+
+        # Every confidence changed with the counts, so the rules are generated again
+        self.association_rules = []
+        self.generate_association_rules()
+        return self.frequent_itemsets, self.association_rules, self.frequent_itemsets_time, self.association_rules_time
+
+    def save_state(self, state_file):
+        """Write the counts update() continues from (frequent itemsets and negative border) to a JSON file."""
+        if self.negative_border is None:
+            if not self.history:
+                raise ValueError("The negative border is unknown and there are no transactions to count it on")
+            self.build_negative_border(self.history)
+
+        def encode(levels):
+            return [[sorted(itemset), count] for itemsets in levels.values() for itemset, count in itemsets.items()]
+
+        state = {
+            "version": 1,
+            "min_support": self.min_support,
+            "min_confidence": self.min_confidence,
+            "counter": self.counter,
+            "rule_engine": self.rule_engine,
+            "num_transactions": self.num_transactions,
+            "max_transaction_length": self.max_transaction_length,
+            "item_labels": list(self.item_index),
+            "frequent_itemsets": encode(self.frequent_itemsets),
+            "negative_border": encode(self.negative_border),
+        }
+        with open(state_file, "w") as file:
+            json.dump(state, file)
+
+    @classmethod
+    def load_state(cls, state_file):
+        """Restore a miner written by save_state, its rules are generated again from the counts."""
+        with open(state_file) as file:
+            state = json.load(file)
+        if state.get("version") != 1:
+            raise ValueError(f"Unsupported state file version {state.get('version')}")
+
+        def decode(entries):
+            levels = {}
+            for itemset, count in entries:
+                levels.setdefault(len(itemset), {})[frozenset(itemset)] = count
+            return {k: levels[k] for k in sorted(levels)}
+
+        miner = cls(state["min_support"], state["min_confidence"], state["counter"], rule_engine=state["rule_engine"])
+        miner.num_transactions = state["num_transactions"]
+        miner.max_transaction_length = state.get("max_transaction_length", 0)
+        miner.item_index = {label: item_id for item_id, label in enumerate(state["item_labels"])}
+        miner.item_names = [str(item) for item in miner.item_index]
+        miner.frequent_itemsets = decode(state["frequent_itemsets"])
+        miner.negative_border = decode(state["negative_border"])
+        miner.generate_association_rules()
+        return miner
+
+    def prepare(self, transactions):
+        """Take over the item encoding of the transactions, returned as a TransactionStore."""
+        # Miners work on the compact store, plain lists of items are encoded first
+        if not isinstance(transactions, TransactionStore):
+            transactions = TransactionStore.from_transactions(transactions)
+        self.item_names = transactions.item_names
+        self.item_index = transactions.item_index
+        self.history = [transactions]
+        self.num_transactions = len(transactions)
+        self.max_transaction_length = longest_transaction(transactions)
+        return transactions
+
     def run(self, transactions):
         """Execute the Apriori algorithm."""
+        transactions = self.prepare(transactions)
         self.get_frequent_itemsets(transactions)
         self.generate_association_rules()
         return self.frequent_itemsets, self.association_rules, self.frequent_itemsets_time, self.association_rules_time
     
+class FPNode:
+    """Node of an FP-tree, it holds one item of a shared transaction prefix and how many transactions share it."""
+    __slots__ = ("item", "count", "parent", "children")
+
+    def __init__(self, item, parent):
+        self.item = item
+        self.count = 0
+        self.parent = parent
+        self.children = {}
+
+class FPGrowth(Apriori):
+    """FP-Growth miner: two passes over the transactions and no candidate generation.
+
+    It shares rule generation and run() with Apriori, so it returns the same tuple and outputs.
+    """
+
+    def __init__(self, min_support, min_confidence, rule_engine="apgenrules"):
+        super().__init__(min_support, min_confidence, rule_engine=rule_engine)
+
+    def build_tree(self, weighted_paths):
+        """Build an FP-tree from (path, count) pairs and return its header table (item -> nodes)."""
+        root = FPNode(None, None)
+        header = {}
+        for path, count in weighted_paths:
+            node = root
+            for item in path:
+                child = node.children.get(item)
+                if child is None:
+                    child = node.children[item] = FPNode(item, node)
+                    header.setdefault(item, []).append(child)
+                child.count += count
+                node = child
+        return header
+
+    def mine_tree(self, header, rank, suffix, levels):
+        """Recursively mine an FP-tree, adding every frequent itemset that ends with suffix to levels."""
+        for item, nodes in header.items():
+            count = sum(node.count for node in nodes)
+            if count < self.min_support:
+                continue
+            itemset = suffix + (item,)
+            if len(itemset) > 1:
+                levels.setdefault(len(itemset), []).append((tuple(sorted(itemset)), count))
+
+            # Conditional pattern base: the prefix path above every node of this item
+            pattern_base = []
+            item_counts = {}
+            for node in nodes:
+                path = []
+                parent = node.parent
+                while parent.item is not None:
+                    path.append(parent.item)
+                    item_counts[parent.item] = item_counts.get(parent.item, 0) + node.count
+                    parent = parent.parent
+                if path:
+                    pattern_base.append((path, node.count))
+
+            # Build the conditional tree with the items that are still frequent, in global rank order
+            pattern_base = [
+                (sorted((i for i in path if item_counts[i] >= self.min_support), key=rank.get), count)
+                for path, count in pattern_base
+            ]
+            conditional_header = self.build_tree((path, count) for path, count in pattern_base if path)
+            if conditional_header:
+                self.mine_tree(conditional_header, rank, itemset, levels)
+
+    def get_frequent_itemsets(self, transactions):
+        """Find all frequent itemsets that meet the minimum support."""
+
+        # start time
+        start_time = time.perf_counter()
+
+        # First pass: count individual items, the 1-itemsets follow the order in which items first appear
+        item_counts = transactions.count_items()
+        frequent_items = {item: count for item, count in enumerate(item_counts) if count >= self.min_support}
+        self.frequent_itemsets[1] = {frozenset([item]): count for item, count in frequent_items.items()}
+        self.record_level(1, generated=len(item_counts), pruned=0, frequent=len(frequent_items),
+                          counting_time=time.perf_counter() - start_time)
+
+        # Second pass: insert every transaction with its frequent items in descending support order
+        rank = {item: r for r, item in enumerate(sorted(frequent_items, key=lambda item: (-frequent_items[item], item)))}
+        header = self.build_tree(
+            (sorted((item for item in transaction if item in rank), key=rank.get), 1) for transaction in transactions
+        )
+
+        levels = {}
+        self.mine_tree(header, rank, (), levels)
+        self.store_levels(levels)
+
+        # end time
+        end_time = time.perf_counter()
+
+        self.frequent_itemsets_time = end_time - start_time
+
+# Mining algorithms selectable from the command line
+ALGORITHMS = ("apriori", "eclat", "fpgrowth")
+
+def build_miner(algorithm, min_support, min_confidence, counter="trie", workers=1, rule_engine="apgenrules", output="all"):
+    """Create the miner for one of ALGORITHMS."""
+    # Closed and maximal itemsets come from their own tid bitset searches, the command line rejects other algorithms
+    if output != "all":
+        return Apriori(min_support, min_confidence, counter, mode="vertical", rule_engine=rule_engine, output=output)
+    if algorithm == "fpgrowth":
+        return FPGrowth(min_support, min_confidence, rule_engine)
+    return Apriori(min_support, min_confidence, counter, mode="vertical" if algorithm == "eclat" else "horizontal", workers=workers,
+                   rule_engine=rule_engine)
+
+class SONPartition(Apriori):
+    """Savasere-Omiecinski-Navathe partition miner for inputs larger than memory.
+
+    Pass one mines every chunk with the threshold scaled to the chunk's share of the transactions, any
+    globally frequent itemset is locally frequent in at least one chunk, so the union of the local results
+    is a complete candidate set. Pass two streams the file again and counts those candidates exactly.
+    """
+
+    def __init__(self, min_support, min_confidence, algorithm="apriori", counter="trie", rule_engine="apgenrules"):
+        super().__init__(min_support, min_confidence, counter, rule_engine=rule_engine)
+        self.algorithm = algorithm
+        self.item_index = {}
+
+    def get_frequent_itemsets(self, transactions):
+        """Find all frequent itemsets of a TransactionFile with two passes over its chunks."""
+
+        # start time
+        start_time = time.perf_counter()
+        num_transactions = len(transactions)
+
+        # Pass one: the union of the locally frequent itemsets of every chunk
+        candidates = set()
+        for chunk in transactions.chunks(self.item_index):
+            # Smallest count with count / len(chunk) >= min_support / num_transactions
+            local_support = max(1, -(-self.min_support * len(chunk) // num_transactions))
+            local_miner = build_miner(self.algorithm, local_support, self.min_confidence, self.counter)
+            local_miner.get_frequent_itemsets(chunk)
+            for itemsets in local_miner.frequent_itemsets.values():
+                candidates.update(tuple(sorted(itemset)) for itemset in itemsets)
+        self.item_names = [str(item) for item in self.item_index]
+
+        # Pass two: exact support of every candidate, counted chunk by chunk and level by level
+        candidates_by_length = {}
+        for candidate in candidates:
+            candidates_by_length.setdefault(len(candidate), []).append(candidate)
+        candidate_counts = dict.fromkeys(candidates, 0)
+        counting_times = dict.fromkeys(candidates_by_length, 0)
+        for chunk in transactions.chunks(self.item_index):
+            for k, length_candidates in candidates_by_length.items():
+                counting_start_time = time.perf_counter()
+                for candidate, count in self.count_support(length_candidates, chunk).items():
+                    candidate_counts[candidate] += count
+                counting_times[k] += time.perf_counter() - counting_start_time
+
+        # Keep the globally frequent itemsets, levels are stored in sorted order like the in-memory miners.
+        # Level 1 is kept even when empty, as Apriori.get_frequent_itemsets does
+        for k in sorted(set(candidates_by_length) | {1}):
+            level = {
+                frozenset(candidate): candidate_counts[candidate]
+                for candidate in sorted(candidates_by_length.get(k, ()))
+                if candidate_counts[candidate] >= self.min_support
+            }
+            if level or k == 1:
+                self.frequent_itemsets[k] = level
+            # Candidates are the union of the local results, no subset check is involved
+            self.record_level(k, generated=len(candidates_by_length.get(k, ())), pruned=0, frequent=len(level),
+                              counting_time=counting_times.get(k, 0))
+
+        # end time
+        end_time = time.perf_counter()
+
+        self.frequent_itemsets_time = end_time - start_time
+
+    def run(self, transactions):
+        """Execute the SON algorithm on a TransactionFile."""
+        self.num_transactions = len(transactions)
+        self.get_frequent_itemsets(transactions)
+        self.generate_association_rules()
+        return self.frequent_itemsets, self.association_rules, self.frequent_itemsets_time, self.association_rules_time
+
+# Format an itemset for the output files, dense item ids are decoded through item_names when given
+def format_itemset(itemset, item_names=None, separator=" "):
+    if item_names is None:
+        return separator.join(itemset)
+    return separator.join(item_names[item] for item in sorted(itemset))
+
+# Bytes buffered by the text writers before a write to disk
+WRITE_BUFFER_SIZE = 1 << 20
+
+class RuleSummary:
+    """What the info file reports about the rules, kept up to date one rule at a time."""
+
+    def __init__(self, association_rules=()):
+        self.count = 0
+        self.highest_confidence_rules = []
+        self.highest_lift_rules = []
+        for rule in association_rules:
+            self.add(rule)
+
+    def add(self, rule):
+        self.count += 1
+        if not self.highest_confidence_rules or rule.confidence > self.highest_confidence_rules[0].confidence:
+            self.highest_confidence_rules = [rule]
+        elif rule.confidence == self.highest_confidence_rules[0].confidence:
+            self.highest_confidence_rules.append(rule)
+        if not self.highest_lift_rules or rule.lift > self.highest_lift_rules[0].lift:
+            self.highest_lift_rules = [rule]
+        elif rule.lift == self.highest_lift_rules[0].lift:
+            self.highest_lift_rules.append(rule)
+
+class ItemsetsFileWriter:
+    """Writes items03.txt one level at a time, item_names can be set as soon as the miner knows them."""
+
+    def __init__(self, transactions_length, output_file="items03.txt", item_names=None):
+        self.transactions_length = transactions_length
+        self.item_names = item_names
+        self.file = open(output_file, "w", buffering=WRITE_BUFFER_SIZE)
+
+    def write_level(self, itemsets):
+        for itemset, support_count in itemsets.items():
+            # Format the itemset as a string
+            itemset_str = format_itemset(itemset, self.item_names) if isinstance(itemset, frozenset) else itemset
+            support = support_count / self.transactions_length
+            # Write the line to the file
+            self.file.write(f"{itemset_str}|{support_count}|{support:.3f}\n")
+
+    def close(self):
+        self.file.close()
+
+class RulesFileWriter:
+    """Writes rules03.txt one rule at a time and keeps the RuleSummary of everything written."""
+
+    def __init__(self, transactions_length, output_file="rules03.txt", item_names=None):
+        self.transactions_length = transactions_length
+        self.item_names = item_names
+        self.summary = RuleSummary()
+        self.file = open(output_file, "w", buffering=WRITE_BUFFER_SIZE)
+
+    def write(self, rule):
+        rule_support = rule.support_count / self.transactions_length
+        self.file.write(f"{format_itemset(rule.lhs, self.item_names)}|{format_itemset(rule.rhs, self.item_names)}|{rule.support_count}|{rule_support:.3f}|{rule.confidence:.3f}|{rule.lift:.3f}\n")
+        self.summary.add(rule)
+
+    def close(self):
+        self.file.close()
+
 # OUTPUT FREQUENT ITEMSETS TXT FILE
-def generate_frequent_itemsets_file(frequent_itemsets, transactions_length, output_file="items03.txt"):
-    # Write the items txt file
-    with open(output_file, "w") as file:
-        # Loop through each itemset size (1-itemsets, 2-itemsets, etc.)
-        for _, itemsets in frequent_itemsets.items():
-            for itemset, support_count in itemsets.items():
-                # Format the itemset as a string
-                itemset_str = " ".join(itemset) if isinstance(itemset, frozenset) else itemset
-                support = support_count / transactions_length
-                # Write the line to the file
-                file.write(f"{itemset_str}|{support_count}|{support:.3f}\n")
+def generate_frequent_itemsets_file(frequent_itemsets, transactions_length, output_file="items03.txt", item_names=None):
+    writer = ItemsetsFileWriter(transactions_length, output_file, item_names)
+    # Loop through each itemset size (1-itemsets, 2-itemsets, etc.)
+    for itemsets in frequent_itemsets.values():
+        writer.write_level(itemsets)
+    writer.close()
 
 # OUTPUT ASSOCIATION RULES TXT FILE
-def generate_association_rules_file(frequent_itemsets, transactions_length, association_rules, output_file="rules03.txt"):
-    # Write the rules txt file
+def generate_association_rules_file(frequent_itemsets, transactions_length, association_rules, output_file="rules03.txt", item_names=None):
+    writer = RulesFileWriter(transactions_length, output_file, item_names)
+    # Loop through each association rule, support and lift come with the rule record
+    for rule in association_rules:
+        writer.write(rule)
+    writer.close()
+
+# OUTPUT COLUMNAR BINARY RESULTS
+def generate_binary_results(frequent_itemsets, association_rules, transactions_length, output_dir, item_names):
+    writer = BinaryResultsWriter(output_dir)
+    for itemsets in frequent_itemsets.values():
+        writer.write_itemsets(itemsets)
+    for rule in association_rules:
+        writer.write_rule(rule)
+    writer.close(item_names, transactions_length)
+
+# One line of the per-level breakdown, metrics a miner does not record for a level are left out
+def format_level_stats(k, stats):
+    parts = []
+    if "generated" in stats:
+        parts.append(f"{stats['generated']} candidates counted, {stats['pruned']} pruned by subset check")
+    if "frequent" in stats:
+        parts.append(f"{stats['frequent']} frequent")
+    if "counting_time" in stats:
+        parts.append(f"counting time {stats['counting_time']:.4f} seconds")
+    parts.append(f"peak RSS {stats['peak_rss_kb']} kB")
+    return f"Level {k}: {', '.join(parts)}"
+
+# OUTPUT PER-LEVEL STATISTICS JSON FILE
+def generate_stats_file(minsuppc, minconf, input_file_name, level_stats, frequent_itemset_time, confident_rules_time,
+                        load_time=None, output_file="stats03.json"):
+    stats = {
+        "minsuppc": minsuppc,
+        "minconf": minconf,
+        "input_file": input_file_name,
+        "load_time": load_time,
+        "frequent_itemsets_time": frequent_itemset_time,
+        "association_rules_time": confident_rules_time,
+        "levels": {str(k): level for k, level in sorted(level_stats.items())},
+    }
     with open(output_file, "w") as file:
-        # Loop through each association rule
-        for lhs, rhs, confidence in association_rules:
-            # Get the support count for the LHS and RHS
-            lhs_support_count = sum([support_count for itemset, support_count in frequent_itemsets.get(len(lhs), {}).items() if lhs.issubset(itemset)])
-            rhs_support_count = frequent_itemsets.get(len(rhs), {}).get(rhs, 0)
-            
-            # Calculate the support for LHS and RHS
-            lhs_support = lhs_support_count / transactions_length
-            rhs_support = rhs_support_count / transactions_length
-            
-            # Calculate the support of the association rule (LHS ∪ RHS)
-            rule_support_count = frequent_itemsets.get(len(lhs.union(rhs)), {}).get(lhs.union(rhs), 0)
-            rule_support = rule_support_count / transactions_length
-            
-            # Calculate lift: rule support / (LHS support * RHS support)
-            lift = rule_support / (lhs_support * rhs_support) if lhs_support > 0 and rhs_support > 0 else 0
-            
-            # Write the rule to the file
-            file.write(f"{' '.join(lhs)}|{' '.join(rhs)}|{rule_support_count}|{rule_support:.3f}|{confidence:.3f}|{lift:.3f}\n")
+        json.dump(stats, file, indent=2)
 
 # Output info.txt file
 def generate_summary_report(minsuppc, minconf, input_file_name, number_of_transactions, transactions, 
                             frequent_itemsets, association_rules, 
-                            frequent_itemset_time, confident_rules_time, output_file="info03.txt"):
-    # Calculate required values
-    num_items = len(set(item for transaction in transactions for item in transaction))
-    max_transaction_length = max(len(transaction) for transaction in transactions)
+                            frequent_itemset_time, confident_rules_time, output_file="info03.txt", item_names=None,
+                            load_time=None, level_stats=None, rule_summary=None, num_items=None, max_transaction_length=None):
+    # Calculate required values, unless the caller already knows them (an update does not load the earlier transactions)
+    if num_items is None:
+        num_items = len(set(item for transaction in transactions for item in transaction))
+    if max_transaction_length is None:
+        max_transaction_length = max(len(transaction) for transaction in transactions)
     
     # Count the number of frequent k-itemsets
     frequent_itemset_counts = {k: len(v) for k, v in frequent_itemsets.items()}
     total_frequent_itemsets = sum(frequent_itemset_counts.values())
 
-    # Find the highest confidence and highest lift rules
-    highest_confidence = max(rule[2] for rule in association_rules) if association_rules else 0
-    highest_lift = 0
-    highest_lift_rules = []
-    
-    # Dictionary to store lift values for each rule
-    rule_lift_values = []
-    
-    # Iterate through all association rules (LHS → RHS) with their confidence values
-    for lhs, rhs, confidence in association_rules:
-        # Compute support count for LHS, RHS, and both LHS or RHS (number of transactions that contains the three attributes)
-        support_count_lhs = sum(frequent_itemsets[k][lhs] for k in frequent_itemsets if lhs in frequent_itemsets[k])
-        support_count_rhs = sum(frequent_itemsets[k][rhs] for k in frequent_itemsets if rhs in frequent_itemsets[k])
-        support_count_rule = sum(frequent_itemsets[k][lhs | rhs] for k in frequent_itemsets if (lhs | rhs) in frequent_itemsets[k])
-
-        # Compute the support
-        support_lhs = support_count_lhs / number_of_transactions # P(LHS)
-        support_rhs = support_count_rhs / number_of_transactions # P(RHS)
-        support_rule = support_count_rule / number_of_transactions # P(LHS, RHS)
-
-        # Compute Lift = P(LHS, RHS) / P(LHS) * P(RHS)
-        lift = support_rule / (support_lhs * support_rhs)
-
-        # Store the rule
-        rule_lift_values.append((lhs, rhs, confidence, lift))
-
-        # Set highest lift
-        if lift > highest_lift:
-            highest_lift = lift
-
-    # Get all rules with the highest confidence and highest lift
-    highest_confidence_rules = [(lhs, rhs, conf) for lhs, rhs, conf in association_rules if conf == highest_confidence]
-    highest_lift_rules = [(lhs, rhs, conf, lift) for lhs, rhs, conf, lift in rule_lift_values if lift == highest_lift]
+    # Find all rules with the highest confidence and highest lift, unless they were collected while the rules were written
+    if rule_summary is None:
+        rule_summary = RuleSummary(association_rules)
+    highest_confidence_rules = rule_summary.highest_confidence_rules
+    highest_lift_rules = rule_summary.highest_lift_rules
+    highest_confidence = highest_confidence_rules[0].confidence if highest_confidence_rules else 0
+    highest_lift = highest_lift_rules[0].lift if highest_lift_rules else 0
 
     # Write the info txt file
     with open(output_file, "w") as file:
@@ -240,28 +1284,35 @@ def generate_summary_report(minsuppc, minconf, input_file_name, number_of_transa
             file.write(f"Number of frequent {k}-itemsets: {count}\n")
         file.write(f"Total number of frequent itemsets: {total_frequent_itemsets}\n")
 
-        file.write(f"Number of high-confidence rules: {len(association_rules)}\n")
+        file.write(f"Number of high-confidence rules: {rule_summary.count}\n")
 
-        file.write(f"The rules with the highest confidence ({highest_confidence}):\n")
-        for lhs, rhs, conf in highest_confidence_rules:
-            file.write(f"{', '.join(lhs)} -> {', '.join(rhs)} | Confidence: {conf}\n")
+        file.write(f"The rules with the highest confidence ({round(highest_confidence, 3)}):\n")
+        for rule in highest_confidence_rules:
+            file.write(f"{format_itemset(rule.lhs, item_names, ', ')} -> {format_itemset(rule.rhs, item_names, ', ')} | Confidence: {round(rule.confidence, 3)}\n")
 
         file.write(f"The rules with the highest lift ({highest_lift:.3f}):\n")
-        for lhs, rhs, conf, lift in highest_lift_rules:
-            file.write(f"{', '.join(lhs)} -> {', '.join(rhs)} | Lift: {lift:.3f}\n")
+        for rule in highest_lift_rules:
+            file.write(f"{format_itemset(rule.lhs, item_names, ', ')} -> {format_itemset(rule.rhs, item_names, ', ')} | Lift: {rule.lift:.3f}\n")
 
+        if level_stats:
+            file.write("Per-level breakdown:\n")
+            for k, stats in sorted(level_stats.items()):
+                file.write(f"{format_level_stats(k, stats)}\n")
+
+        if load_time is not None:
+            file.write(f"Time in seconds to load the transactions: {load_time:.4f}\n")
         file.write(f"Time in seconds to find the frequent itemsets: {frequent_itemset_time:.4f}\n")
         file.write(f"Time in seconds to find the confident rules: {confident_rules_time:.4f}\n")
 
 def practice_test(min_support, min_confidence, file_name=''):
     # Transactions simple example
-    transactions = [
+    transactions = TransactionStore.from_transactions([
         ["milk", "bread", "nuts", "apple"],
         ["milk", "bread", "nuts"],
         ["milk", "bread"],
         ["milk", "bread", "apple"],
         ["bread", "apple"],
-    ]
+    ])
     
     # Running Apriori Algorithm
     apriori = Apriori(min_support, min_confidence)
@@ -270,79 +1321,251 @@ def practice_test(min_support, min_confidence, file_name=''):
     # Printing all frequent itemsets
     print("Printing the frequent itemset, the number next to the set is the support count.")
     print(f"Time to find all frequent itemsets: {frequent_itemsets_time:.4f} seconds")
-    print("Frequent Itemsets:", frequent_itemsets)
+    print("Frequent Itemsets:", {k: {apriori.decode_itemset(itemset): count for itemset, count in itemsets.items()} for k, itemsets in frequent_itemsets.items()})
     print()
 
     # Printin all association rules
     print("Printing the association rules based on the frequent itemsets. The number next to the association is the confidence.")
     print(f"Time to find all association rules: {rules_time:.4f} seconds")
-    print("Association Rules:", rules)
+    print("Association Rules:", [(apriori.decode_itemset(rule.lhs), apriori.decode_itemset(rule.rhs), round(rule.confidence, 3)) for rule in rules])
     #apriori.print_association_rules()
 
     # create output files
-    generate_frequent_itemsets_file(frequent_itemsets, len(transactions))
-    generate_association_rules_file(frequent_itemsets, len(transactions), rules)
-    generate_summary_report(min_support, min_confidence, "small.txt", len(transactions), transactions, frequent_itemsets, rules, frequent_itemsets_time, rules_time)
-
-def execute_program(min_support, min_confidence, file_name):
-    transactions = []
-    current_transaction = []  # Initialize an empty list for the current transaction ID
-    previous_transaction_id = None  # Track the previous transaction ID
-    
-    with open(file_name, "r") as file:
-        for line in file:
-            transaction_id, item_id = map(int, line.split())  # Split the line into two numbers
-            
-            # If we encounter a new transaction ID, save the previous transaction
-            if transaction_id != previous_transaction_id and previous_transaction_id is not None:
-                transactions.append(current_transaction)  # Add the current transaction to transactions list
-                current_transaction = []  # Reset the list for the new transaction ID
-            
-            # Add the item ID to the current transaction
-            current_transaction.append(str(item_id))
-            
-            # Update the previous transaction ID
-            previous_transaction_id = transaction_id
-        
-        # Add the last transaction
-        if current_transaction:
-            transactions.append(current_transaction)
+    generate_frequent_itemsets_file(frequent_itemsets, len(transactions), item_names=transactions.item_names)
+    generate_association_rules_file(frequent_itemsets, len(transactions), rules, item_names=transactions.item_names)
+    generate_summary_report(min_support, min_confidence, "small.txt", len(transactions), transactions, frequent_itemsets, rules, frequent_itemsets_time, rules_time,
+                            item_names=transactions.item_names, level_stats=apriori.level_stats)
+
+def execute_program(min_support, min_confidence, file_name, algorithm="apriori", counter="trie", workers=1, chunk_size=None,
+                    dump_file=None, use_cache=False, rule_engine="apgenrules", top_k=None, top_k_order="confidence", output="all",
+                    state_file=None, stats="text", print_results=False, binary_dir=None):
+    # start time of loading
+    start_time = time.perf_counter()
+
+    if chunk_size:
+        # SON partition mode streams the file in chunks of chunk_size transactions, nothing else is kept in memory
+        transactions = TransactionFile(file_name, chunk_size)
+        # The counting scan SON needs to scale its threshold is part of the load time
+        len(transactions)
+        miner = SONPartition(min_support, min_confidence, algorithm, counter, rule_engine)
+    else:
+        # Encode the transactions straight into the compact store, item ids are dense ints from here on.
+        # With the cache a previous encoding of the same file is memory-mapped instead of parsed
+        transactions = load_cached_transactions(file_name) if use_cache else load_transactions(file_name)
     
-    # Check if the transactions were stored in the desired format
-    with open("transactions.txt", "w") as file:
-        for transaction in transactions:
-            file.write(f"{transaction}\n")
+        # Optionally check if the transactions were stored in the desired format
+        if dump_file:
+            dump_transactions(transactions, dump_file)
 
-    # Running the Apriori Algorithm
-    apriori = Apriori(min_support, min_confidence)
-    frequent_itemsets, rules, frequent_itemsets_time, rules_time = apriori.run(transactions)
+        miner = build_miner(algorithm, min_support, min_confidence, counter, workers, rule_engine, output)
+
+    load_time = time.perf_counter() - start_time
+
+    # Unless the results are printed, items and rules are written while they are found and the rules are not kept.
+    # Top-k only knows its rules at the end, so it is written afterwards
+    streaming = not (print_results or top_k)
+    if streaming:
+        items_writer = ItemsetsFileWriter(len(transactions))
+        rules_writer = RulesFileWriter(len(transactions))
+        binary_writer = BinaryResultsWriter(binary_dir) if binary_dir else None
+
+        # A hook set on the miner before still runs after the level is written
+        on_level = miner.on_level
+
+        def write_level(k, stats):
+            # Item names are complete once a level is recorded, SON only builds them in its first pass
+            items_writer.item_names = rules_writer.item_names = miner.item_names
+            items_writer.write_level(miner.frequent_itemsets.get(k, {}))
+            if binary_writer is not None:
+                binary_writer.write_itemsets(miner.frequent_itemsets.get(k, {}))
+            if on_level is not None:
+                on_level(k, stats)
+
+        def write_rule(rule):
+            rules_writer.write(rule)
+            if binary_writer is not None:
+                binary_writer.write_rule(rule)
+
+        miner.on_level = write_level
+        miner.rule_sink = write_rule
+
+    # Running the selected mining algorithm, top-k raises minsup (by support) or minconf (by confidence) as it goes.
+    # The streaming writers are closed even when mining fails, so no file is left open or with an unfinished header
+    try:
+        if top_k:
+            frequent_itemsets, rules, frequent_itemsets_time, rules_time = miner.run_top_k(transactions, top_k, top_k_order)
+            if top_k_order == "support":
+                print(f"Top {top_k} rules by support found with a final support threshold of {miner.min_support}")
+            else:
+                print(f"Top {top_k} rules by {top_k_order} found with a final confidence threshold of {miner.min_confidence:.3f}")
+        else:
+            frequent_itemsets, rules, frequent_itemsets_time, rules_time = miner.run(transactions)
+    finally:
+        if streaming:
+            items_writer.close()
+            rules_writer.close()
+            if binary_writer is not None:
+                binary_writer.close(miner.item_names, len(transactions))
     
     # Print the information of frequent itemsets that were found
-    print("Printing the frequent itemset, the number next to the set is the support count.")
+    print(f"Time to load the transactions: {load_time:.4f} seconds")
     print(f"Time to find all frequent itemsets: {frequent_itemsets_time:.4f} seconds")
-    print("Frequent Itemsets:", frequent_itemsets)
+    if stats == "text":
+        for k, level in sorted(miner.level_stats.items()):
+            print(format_level_stats(k, level))
+    if print_results:
+        print("Printing the frequent itemset, the number next to the set is the support count.")
+        print("Frequent Itemsets:", {k: {miner.decode_itemset(itemset): count for itemset, count in itemsets.items()} for k, itemsets in frequent_itemsets.items()})
     print()
 
     # Print infomration of association rules that were found
-    print("Printing the association rules based on the frequent itemsets. The number next to the association is the confidence.")
     print(f"Time to find all association rules: {rules_time:.4f} seconds")
-    print("Association Rules:", rules)
-    #apriori.print_association_rules()
+    if print_results:
+        print("Printing the association rules based on the frequent itemsets. The number next to the association is the confidence.")
+        print("Association Rules:", [(miner.decode_itemset(rule.lhs), miner.decode_itemset(rule.rhs), round(rule.confidence, 3)) for rule in rules])
+    #miner.print_association_rules()
 
-    #create output files
-    generate_frequent_itemsets_file(frequent_itemsets, len(transactions))
-    generate_association_rules_file(frequent_itemsets, len(transactions), rules)
-    generate_summary_report(min_support, min_confidence, file_name, len(transactions), transactions, 
-                            frequent_itemsets, rules, frequent_itemsets_time, rules_time
+    #create output files, item names are restored only here
+    if streaming:
+        rule_summary = rules_writer.summary
+    else:
+        generate_frequent_itemsets_file(frequent_itemsets, len(transactions), item_names=miner.item_names)
+        generate_association_rules_file(frequent_itemsets, len(transactions), rules, item_names=miner.item_names)
+        if binary_dir:
+            generate_binary_results(frequent_itemsets, rules, len(transactions), binary_dir, miner.item_names)
+        rule_summary = None
+    generate_summary_report(miner.min_support, min_confidence, file_name, len(transactions), transactions, 
+                            frequent_itemsets, rules, frequent_itemsets_time, rules_time, item_names=miner.item_names,
+                            load_time=load_time, level_stats=miner.level_stats, rule_summary=rule_summary
     )
+    if stats == "json":
+        generate_stats_file(miner.min_support, min_confidence, file_name, miner.level_stats, frequent_itemsets_time, rules_time, load_time)
+
+    # Keep the counts for later update runs
+    if state_file:
+        miner.save_state(state_file)
+        print(f"Saved the mining state to {state_file}")
 
     # Confirmation message
     print("\nOUTPUT FILES WERE SUCCESSFULLY GENERATED")
+
+def execute_update(state_file, file_name, history_files=()):
+    """Add the transactions of file_name to a saved run and rewrite the state and the item, rule and info files."""
+    miner = Apriori.load_state(state_file)
+
+    # Every file is encoded with the ids of the saved run, the history is only parsed when the update needs it
+    transactions = load_transactions(file_name, miner.item_index)
+    history = [load_transactions(history_file, miner.item_index) for history_file in history_files]
+    frequent_itemsets, rules, frequent_itemsets_time, rules_time = miner.update(transactions, history)
+    miner.save_state(state_file)
+
+    print(f"Added {len(transactions)} transactions, {miner.num_transactions} in total")
+    print(f"Time to update the frequent itemsets: {frequent_itemsets_time:.4f} seconds")
+    print(f"Time to find all association rules: {rules_time:.4f} seconds")
+    for k, itemsets in frequent_itemsets.items():
+        print(f"Number of frequent {k}-itemsets: {len(itemsets)}")
+    print(f"Number of high-confidence rules: {len(rules)}")
+
+    generate_frequent_itemsets_file(frequent_itemsets, miner.num_transactions, item_names=miner.item_names)
+    generate_association_rules_file(frequent_itemsets, miner.num_transactions, rules, item_names=miner.item_names)
+    # Every item id was handed out for an item that occurs in some transaction
+    generate_summary_report(miner.min_support, miner.min_confidence, f"{state_file} + {file_name}", miner.num_transactions, None,
+                            frequent_itemsets, rules, frequent_itemsets_time, rules_time, item_names=miner.item_names,
+                            num_items=len(miner.item_index), max_transaction_length=miner.max_transaction_length)
+    print("\nOUTPUT FILES WERE SUCCESSFULLY GENERATED")
     
+def execute_sweep(min_supports, min_confidences, file_name, output_dir=".", first_index=1, algorithm="apriori", counter="trie",
+                  workers=1, use_cache=False, rule_engine="apgenrules"):
+    """Write info<n>.txt for every (minsup, minconf) pair from a single mining pass at the lowest thresholds.
+
+    Frequent itemsets at a higher minsup are exactly the ones mined at the lowest minsup whose count reaches it,
+    and the rules of a setting are the ones whose itemset reaches its minsup and whose confidence reaches its minconf.
+    """
+    # start time of loading
+    start_time = time.perf_counter()
+    transactions = load_cached_transactions(file_name) if use_cache else load_transactions(file_name)
+    load_time = time.perf_counter() - start_time
+
+    # One mining pass and one rule pass at the lowest thresholds
+    miner = build_miner(algorithm, min(min_supports), min(min_confidences), counter, workers, rule_engine)
+    frequent_itemsets, rules, frequent_itemsets_time, rules_time = miner.run(transactions)
+    print(f"Time to find all frequent itemsets at minsup {min(min_supports)}: {frequent_itemsets_time:.4f} seconds")
+    print(f"Time to find all association rules at minconf {min(min_confidences)}: {rules_time:.4f} seconds")
+
+    # The item and length figures of every info file come from the encoding, not from another scan per setting
+    num_items = len(miner.item_index)
+    max_transaction_length = miner.max_transaction_length
+
+    os.makedirs(output_dir, exist_ok=True)
+    index = first_index
+    for min_support in min_supports:
+        # Derive the frequent itemsets of this minsup by filtering the counts
+        start_time = time.perf_counter()
+        setting_itemsets = {}
+        for k, itemsets in frequent_itemsets.items():
+            level = {itemset: count for itemset, count in itemsets.items() if count >= min_support}
+            if level or k == 1:
+                setting_itemsets[k] = level
+        setting_itemsets_time = time.perf_counter() - start_time
+
+        for min_confidence in min_confidences:
+            # Derive the rules of this setting by filtering on their itemset count and confidence
+            start_time = time.perf_counter()
+            setting_rules = [rule for rule in rules if rule.confidence >= min_confidence and rule.support_count >= min_support]
+            setting_rules_time = time.perf_counter() - start_time
+
+            # The usual time lines and the per-level breakdown report the shared passes, the filtering of this setting
+            # is recorded separately
+            output_file = os.path.join(output_dir, f"info{index}.txt")
+            generate_summary_report(min_support, min_confidence, file_name, len(transactions), transactions,
+                                    setting_itemsets, setting_rules, frequent_itemsets_time, rules_time,
+                                    output_file=output_file, item_names=miner.item_names, load_time=load_time,
+                                    level_stats=miner.level_stats, num_items=num_items,
+                                    max_transaction_length=max_transaction_length)
+            with open(output_file, "a") as file:
+                file.write(f"Time in seconds to filter the frequent itemsets of this setting: {setting_itemsets_time:.4f}\n")
+                file.write(f"Time in seconds to filter the confident rules of this setting: {setting_rules_time:.4f}\n")
+            print(f"Wrote {output_file} (minsup {min_support}, minconf {min_confidence})")
+            index += 1
+
+# Options shared by a single run and a sweep
+def add_mining_arguments(parser):
+    parser.add_argument("--algorithm", choices=ALGORITHMS, default="apriori", help="Frequent itemset mining algorithm")
+    parser.add_argument("--counter", choices=Apriori.COUNTING_ENGINES, default="trie", help="Support counting engine (apriori only)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for support counting (apriori only)")
+    parser.add_argument("--rules", choices=Apriori.RULE_ENGINES, default="apgenrules", help="Association rule engine")
+    parser.add_argument("--cache", action="store_true",
+                        help="Keep the encoded transactions in a binary cache next to the input file and reuse it")
+
 # Example usage
 if __name__ == "__main__":
     pass
 
+    # The sweep subcommand derives many (minsup, minconf) settings from one mining pass
+    if sys.argv[1:2] == ["sweep"]:
+        parser = argparse.ArgumentParser(prog=f"{sys.argv[0]} sweep", description="Write info files for a grid of minsup and minconf values.")
+        parser.add_argument("input_file_name", type=str, help="The name of the input file")
+        parser.add_argument("--minsup", type=int, nargs="+", required=True, help="Minimum support counts")
+        parser.add_argument("--minconf", type=float, nargs="+", required=True, help="Minimum confidence values")
+        parser.add_argument("--output-dir", default=".", help="Directory for the info<n>.txt files")
+        parser.add_argument("--first-index", type=int, default=1, help="Number of the first info file")
+        add_mining_arguments(parser)
+        args = parser.parse_args(sys.argv[2:])
+        execute_sweep(args.minsup, args.minconf, args.input_file_name, args.output_dir, args.first_index, args.algorithm,
+                      args.counter, args.workers, args.cache, args.rules)
+        sys.exit()
+
+    # The update subcommand adds a batch of transactions to a run saved with --save-state
+    if sys.argv[1:2] == ["update"]:
+        parser = argparse.ArgumentParser(prog=f"{sys.argv[0]} update", description="Add new transactions to a saved run.")
+        parser.add_argument("state_file", type=str, help="State file written by --save-state, it is updated in place")
+        parser.add_argument("input_file_name", type=str, help="The file with the new transactions")
+        parser.add_argument("--history", nargs="+", default=[], metavar="FILE",
+                            help="Transaction files of the earlier runs, needed when an itemset has to be counted again")
+        args = parser.parse_args(sys.argv[2:])
+        execute_update(args.state_file, args.input_file_name, args.history)
+        sys.exit()
+
     # Set up argument parser
     parser = argparse.ArgumentParser(description="Process minsup, minconf, and input file name.")
     
@@ -350,13 +1573,47 @@ if __name__ == "__main__":
     parser.add_argument("minsup", type=int, help="Minimum support value (float)")
     parser.add_argument("minconf", type=float, help="Minimum confidence value (float)")
     parser.add_argument("input_file_name", type=str, help="The name of the input file")
+    add_mining_arguments(parser)
+    parser.add_argument("--dump-transactions", nargs="?", const="transactions.txt", default=None, metavar="FILE",
+                        help="Write the parsed transactions to FILE (default transactions.txt) for debugging")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Mine the file in chunks of this many transactions (SON partition mode)")
+    parser.add_argument("--top-k", type=int, default=None, metavar="K",
+                        help="Keep only the K best rules by --top-k-order; by support minsup is the floor the threshold rises "
+                             "from, by confidence or lift every itemset is mined at minsup")
+    parser.add_argument("--top-k-order", choices=Apriori.TOP_K_ORDERS, default="confidence", help="Measure the top-k rules are ranked by")
+    parser.add_argument("--output", choices=Apriori.OUTPUT_MODES, default="all",
+                        help="Frequent itemsets to mine and write, closed keeps exact rules, maximal writes no rules")
+    parser.add_argument("--stats", choices=("text", "json"), default="text",
+                        help="Print the per-level metrics, or write them to stats03.json")
+    parser.add_argument("--print", action="store_true", dest="print_results",
+                        help="Also print every frequent itemset and rule, which keeps the rules in memory")
+    parser.add_argument("--binary", default=None, metavar="DIR",
+                        help="Also write the itemsets and rules as memory-mappable .npy columns to DIR")
+    parser.add_argument("--save-state", default=None, metavar="FILE", help="Save the counts the update subcommand continues from")
     
     # Parse arguments
     args = parser.parse_args()
+    if args.top_k is not None and args.top_k < 1:
+        parser.error("--top-k must be at least 1")
+    if args.chunk_size and (args.workers > 1 or args.cache or args.dump_transactions):
+        parser.error("--chunk-size cannot be combined with --workers, --cache or --dump-transactions")
+    if args.top_k is not None and args.chunk_size:
+        parser.error("--top-k cannot be combined with --chunk-size")
+    if args.top_k is not None and args.top_k_order == "support" and (args.algorithm != "apriori" or args.workers > 1):
+        parser.error("--top-k-order support runs its own level-wise search and cannot be combined with --algorithm eclat/fpgrowth or --workers")
+    if args.output != "all" and (args.chunk_size or args.top_k is not None):
+        parser.error("--output closed/maximal cannot be combined with --chunk-size or --top-k")
+    if args.output != "all" and (args.algorithm != "apriori" or args.counter != "trie" or args.workers > 1):
+        parser.error("--output closed/maximal runs its own tid bitset search and cannot be combined with --algorithm eclat/fpgrowth, "
+                     "--counter naive or --workers")
+    if args.save_state and (args.chunk_size or args.output != "all"):
+        parser.error("--save-state cannot be combined with --chunk-size or --output closed/maximal")
 
     # This function executes the test example provided by the skeleton
     #practice_test(args.minsup, args.minconf)
 
     # This function executes the actual requirements with the three input variables
     # minimum support count, minimum confidence, and input file name (transactions)
-    execute_program(args.minsup, args.minconf, args.input_file_name)
\ No newline at end of file
+    execute_program(args.minsup, args.minconf, args.input_file_name, args.algorithm, args.counter, args.workers, args.chunk_size,
+                    args.dump_transactions, args.cache, args.rules, args.top_k, args.top_k_order, args.output,
+                    args.save_state, args.stats, args.print_results, args.binary)
\ No newline at end of file
@@ -0,0 +1,56 @@
+"""Shared fixtures: one small synthetic basket set and the plain Apriori results every other miner must reproduce."""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmark import generate_quest_transactions, load_miners, write_transactions
+from transaction_loader import TransactionStore
+
+miners = load_miners()
+
+MIN_SUPPORT = 8
+MIN_CONFIDENCE = 0.5
+
+def itemsets_by_name(miner):
+    """All frequent itemsets of a miner keyed by item names, ids differ between encodings."""
+    return {
+        frozenset(miner.item_names[item] for item in itemset): count
+        for itemsets in miner.frequent_itemsets.values()
+        for itemset, count in itemsets.items()
+    }
+
+def rules_by_name(miner, rules=None):
+    return {
+        (frozenset(miner.item_names[item] for item in rule.lhs), frozenset(miner.item_names[item] for item in rule.rhs)):
+            (rule.support_count, round(rule.confidence, 9), round(rule.lift, 9))
+        for rule in (miner.association_rules if rules is None else rules)
+    }
+
+@pytest.fixture(scope="session")
+def transactions():
+    return generate_quest_transactions(400, 6, 150, avg_pattern_length=3, seed=7)
+
+@pytest.fixture(scope="session")
+def store(transactions):
+    return TransactionStore.from_transactions(transactions)
+
+@pytest.fixture(scope="session")
+def reference_miner(transactions):
+    miner = miners.Apriori(MIN_SUPPORT, MIN_CONFIDENCE, counter="naive", rule_engine="enumerate")
+    miner.run(TransactionStore.from_transactions(transactions))
+    return miner
+
+@pytest.fixture(scope="session")
+def reference(reference_miner):
+    return itemsets_by_name(reference_miner), rules_by_name(reference_miner)
+
+@pytest.fixture
+def transactions_file(tmp_path, transactions):
+    """The synthetic baskets as a "tid item" file."""
+    file_name = str(tmp_path / "transactions.txt")
+    write_transactions(transactions, file_name)
+    return file_name
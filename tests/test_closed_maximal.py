@@ -0,0 +1,39 @@
+"""Closed and maximal itemset searches against a brute-force filter of all frequent itemsets."""
+import subprocess
+import sys
+
+import pytest
+
+from conftest import MIN_CONFIDENCE, MIN_SUPPORT, ROOT, itemsets_by_name, miners, rules_by_name
+
+def test_closed(store, reference):
+    itemsets, rules = reference
+    # An itemset is closed when no superset has the same count
+    closed = {
+        itemset: count for itemset, count in itemsets.items()
+        if not any(itemset < other and count == other_count for other, other_count in itemsets.items())
+    }
+    miner = miners.Apriori(MIN_SUPPORT, MIN_CONFIDENCE, output="closed")
+    miner.run(store)
+    assert itemsets_by_name(miner) == closed
+    # Exact rules: the ones whose itemset is closed, with supports derived from the closures
+    assert rules_by_name(miner) == {rule: stats for rule, stats in rules.items() if rule[0] | rule[1] in closed}
+
+def test_maximal(store, reference):
+    itemsets, _ = reference
+    # An itemset is maximal when no superset is frequent
+    maximal = {itemset: count for itemset, count in itemsets.items() if not any(itemset < other for other in itemsets)}
+    miner = miners.Apriori(MIN_SUPPORT, MIN_CONFIDENCE, output="maximal")
+    miner.run(store)
+    assert itemsets_by_name(miner) == maximal
+    assert miner.association_rules == []
+
+@pytest.mark.parametrize("option", (["--algorithm", "fpgrowth"], ["--algorithm", "eclat"], ["--counter", "naive"], ["--workers", "2"]))
+def test_ignored_options_are_rejected(tmp_path, transactions_file, option):
+    result = subprocess.run(
+        [sys.executable, f"{ROOT}/generate-rules03.py", str(MIN_SUPPORT), str(MIN_CONFIDENCE), transactions_file,
+         "--output", "closed", *option],
+        cwd=tmp_path, capture_output=True, text=True,
+    )
+    assert result.returncode == 2
+    assert "--output closed/maximal" in result.stderr
@@ -0,0 +1,22 @@
+"""The prefix-trie counting engine against the naive reference."""
+from conftest import MIN_CONFIDENCE, MIN_SUPPORT, itemsets_by_name, miners, rules_by_name
+
+def test_reference_is_not_trivial(reference):
+    itemsets, rules = reference
+    assert max(len(itemset) for itemset in itemsets) >= 3
+    assert rules
+
+def test_trie_matches_naive(store, reference_miner, reference):
+    miner = miners.Apriori(MIN_SUPPORT, MIN_CONFIDENCE, counter="trie", rule_engine="enumerate")
+    miner.run(store)
+    assert (itemsets_by_name(miner), rules_by_name(miner)) == reference
+    # Both engines count the same candidates
+    assert {k: stats["generated"] for k, stats in miner.level_stats.items()} == \
+        {k: stats["generated"] for k, stats in reference_miner.level_stats.items()}
+
+def test_count_support_engines(store):
+    candidates = [(0, 1), (1, 2), (0, 2), (3, 4)]
+    naive = miners.Apriori(1, MIN_CONFIDENCE, counter="naive").count_support(candidates, store)
+    trie = miners.Apriori(1, MIN_CONFIDENCE, counter="trie").count_support(candidates, store)
+    expected = {candidate: sum(set(candidate) <= set(transaction) for transaction in store) for candidate in candidates}
+    assert naive == trie == expected
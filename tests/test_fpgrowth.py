@@ -0,0 +1,18 @@
+"""FP-Growth against the Apriori reference."""
+import pytest
+
+from conftest import MIN_CONFIDENCE, MIN_SUPPORT, itemsets_by_name, miners, rules_by_name
+
+@pytest.mark.parametrize("rule_engine", miners.Apriori.RULE_ENGINES)
+def test_fpgrowth_matches_apriori(store, reference, rule_engine):
+    miner = miners.build_miner("fpgrowth", MIN_SUPPORT, MIN_CONFIDENCE, rule_engine=rule_engine)
+    miner.run(store)
+    assert (itemsets_by_name(miner), rules_by_name(miner)) == reference
+
+def test_levels_in_apriori_order(store):
+    apriori = miners.Apriori(MIN_SUPPORT, MIN_CONFIDENCE)
+    apriori.get_frequent_itemsets(store)
+    fpgrowth = miners.FPGrowth(MIN_SUPPORT, MIN_CONFIDENCE)
+    fpgrowth.get_frequent_itemsets(store)
+    assert {k: list(itemsets) for k, itemsets in fpgrowth.frequent_itemsets.items()} == \
+        {k: list(itemsets) for k, itemsets in apriori.frequent_itemsets.items()}
@@ -0,0 +1,59 @@
+"""Streamed and columnar binary output against the files written from the finished run."""
+import os
+
+import pytest
+
+from binary_results import read_column
+from conftest import MIN_CONFIDENCE, MIN_SUPPORT, miners
+
+OUTPUT_FILES = ("items03.txt", "rules03.txt")
+COLUMNS = ("itemset_offsets", "itemset_items", "itemset_support", "lhs_offsets", "lhs_items", "rhs_offsets", "rhs_items",
+           "rule_support", "rule_confidence", "rule_lift")
+
+def run(directory, monkeypatch, transactions_file, **options):
+    os.makedirs(directory)
+    monkeypatch.chdir(directory)
+    miners.execute_program(MIN_SUPPORT, MIN_CONFIDENCE, transactions_file, binary_dir="binary", **options)
+    return {name: (directory / name).read_bytes() for name in OUTPUT_FILES}
+
+@pytest.mark.parametrize("options", ({}, {"algorithm": "fpgrowth"}, {"chunk_size": 150}))
+def test_streamed_files_match(tmp_path, monkeypatch, transactions_file, options):
+    streamed = run(tmp_path / "streamed", monkeypatch, transactions_file, **options)
+    # Printing keeps every rule in memory and writes the files once the run is finished
+    kept = run(tmp_path / "kept", monkeypatch, transactions_file, print_results=True, **options)
+    assert streamed == kept
+    for column in COLUMNS:
+        assert list(read_column(str(tmp_path / "streamed" / "binary" / f"{column}.npy"))) == \
+            list(read_column(str(tmp_path / "kept" / "binary" / f"{column}.npy")))
+
+def test_binary_columns_match_the_run(tmp_path, store):
+    miner = miners.Apriori(MIN_SUPPORT, MIN_CONFIDENCE)
+    frequent_itemsets, rules, _, _ = miner.run(store)
+    directory = str(tmp_path / "binary")
+    miners.generate_binary_results(frequent_itemsets, rules, len(store), directory, miner.item_names)
+
+    def column(name):
+        return list(read_column(os.path.join(directory, f"{name}.npy")))
+
+    itemsets = [itemset for level in frequent_itemsets.values() for itemset in level]
+    offsets, items = column("itemset_offsets"), column("itemset_items")
+    assert [frozenset(items[start:end]) for start, end in zip(offsets, offsets[1:])] == itemsets
+    assert column("itemset_support") == [count for level in frequent_itemsets.values() for count in level.values()]
+    offsets, items = column("rhs_offsets"), column("rhs_items")
+    assert [frozenset(items[start:end]) for start, end in zip(offsets, offsets[1:])] == [rule.rhs for rule in rules]
+    assert column("rule_confidence") == [rule.confidence for rule in rules]
+    assert column("rule_lift") == [rule.lift for rule in rules]
+
+def test_writers_are_closed_when_mining_fails(tmp_path, monkeypatch, transactions_file):
+    def fail(self):
+        raise RuntimeError("rule generation failed")
+    monkeypatch.setattr(miners.Apriori, "generate_association_rules", fail)
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(RuntimeError):
+        miners.execute_program(MIN_SUPPORT, MIN_CONFIDENCE, transactions_file, binary_dir="binary")
+
+    # The levels found before the failure are complete on disk, with final column headers
+    with open(tmp_path / "items03.txt") as file:
+        written = sum(1 for _ in file)
+    assert written > 0
+    assert len(read_column(str(tmp_path / "binary" / "itemset_support.npy"))) == written
@@ -0,0 +1,23 @@
+"""The ap-genrules rule engine against the enumerating reference."""
+import pytest
+
+from conftest import MIN_CONFIDENCE, MIN_SUPPORT, miners, rules_by_name
+
+@pytest.mark.parametrize("min_confidence", (MIN_CONFIDENCE, 0.8, 1.0))
+def test_apgenrules_matches_enumerate(store, min_confidence):
+    rules = {}
+    for rule_engine in miners.Apriori.RULE_ENGINES:
+        miner = miners.Apriori(MIN_SUPPORT, min_confidence, rule_engine=rule_engine)
+        miner.run(store)
+        rules[rule_engine] = rules_by_name(miner)
+    assert rules["apgenrules"] == rules["enumerate"]
+    assert rules["enumerate"] or min_confidence == 1.0
+
+@pytest.mark.parametrize("rule_engine", miners.Apriori.RULE_ENGINES)
+def test_confidence_is_not_rounded(rule_engine):
+    # a -> b has confidence 2/3, which only reaches 0.667 when rounded
+    transactions = [["a", "b"], ["a", "b"], ["a"]]
+    miner = miners.Apriori(1, 0.667, rule_engine=rule_engine)
+    miner.run(transactions)
+    assert [(miner.decode_itemset(rule.lhs), miner.decode_itemset(rule.rhs)) for rule in miner.association_rules] == \
+        [(frozenset("b"), frozenset("a"))]
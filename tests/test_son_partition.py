@@ -0,0 +1,32 @@
+"""SON partition mode against the in-memory miners."""
+import subprocess
+import sys
+
+import pytest
+
+from conftest import MIN_CONFIDENCE, MIN_SUPPORT, ROOT, itemsets_by_name, miners, rules_by_name
+from transaction_loader import TransactionFile
+
+@pytest.mark.parametrize("algorithm", miners.ALGORITHMS)
+def test_son_matches_in_memory(transactions_file, reference, algorithm):
+    miner = miners.SONPartition(MIN_SUPPORT, MIN_CONFIDENCE, algorithm)
+    miner.run(TransactionFile(transactions_file, 150))
+    assert (itemsets_by_name(miner), rules_by_name(miner)) == reference
+
+def test_empty_level_one_is_kept(transactions_file, store):
+    in_memory = miners.Apriori(len(store) + 1, MIN_CONFIDENCE)
+    in_memory.run(store)
+    miner = miners.SONPartition(len(store) + 1, MIN_CONFIDENCE)
+    miner.run(TransactionFile(transactions_file, 150))
+    assert miner.frequent_itemsets == in_memory.frequent_itemsets == {1: {}}
+    assert 1 in miner.level_stats
+
+@pytest.mark.parametrize("option", (["--workers", "2"], ["--cache"], ["--dump-transactions"], ["--top-k", "5"]))
+def test_ignored_options_are_rejected(tmp_path, transactions_file, option):
+    result = subprocess.run(
+        [sys.executable, f"{ROOT}/generate-rules03.py", str(MIN_SUPPORT), str(MIN_CONFIDENCE), transactions_file,
+         "--chunk-size", "150", *option],
+        cwd=tmp_path, capture_output=True, text=True,
+    )
+    assert result.returncode == 2
+    assert "--chunk-size" in result.stderr
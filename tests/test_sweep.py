@@ -0,0 +1,42 @@
+"""The sweep subcommand: every info file must match a separate run of its setting."""
+import os
+
+import pytest
+
+from conftest import miners
+
+MIN_SUPPORTS = (8, 12, 100000)
+MIN_CONFIDENCES = (0.5, 0.9)
+
+def summary(file_name):
+    """The lines of an info file up to the per-level breakdown, which reports the mining pass itself."""
+    with open(file_name) as file:
+        lines = file.read().splitlines()
+    return lines[:lines.index("Per-level breakdown:")]
+
+@pytest.fixture
+def sweep_dir(tmp_path, transactions_file):
+    output_dir = str(tmp_path / "sweep")
+    miners.execute_sweep(MIN_SUPPORTS, MIN_CONFIDENCES, transactions_file, output_dir, first_index=3)
+    return output_dir
+
+def test_sweep_matches_separate_runs(tmp_path, monkeypatch, transactions_file, sweep_dir):
+    monkeypatch.chdir(tmp_path)
+    index = 3
+    for min_support in MIN_SUPPORTS:
+        for min_confidence in MIN_CONFIDENCES:
+            miners.execute_program(min_support, min_confidence, transactions_file)
+            assert summary(os.path.join(sweep_dir, f"info{index}.txt")) == summary("info03.txt")
+            index += 1
+    assert not os.path.exists(os.path.join(sweep_dir, f"info{index}.txt"))
+
+def test_sweep_info_files(sweep_dir):
+    with open(os.path.join(sweep_dir, "info7.txt")) as file:
+        lines = file.read().splitlines()
+    # No item reaches the highest minsup, the level is still reported
+    assert "Number of frequent 1-itemsets: 0" in lines
+    assert "Total number of frequent itemsets: 0" in lines
+    # generate-plots03.py reads the shared mining time, the filtering of the setting has its own labels
+    assert sum(line.startswith("Time in seconds to find the frequent itemsets") for line in lines) == 1
+    assert any(line.startswith("Time in seconds to filter the frequent itemsets of this setting") for line in lines)
+    assert any(line.startswith("Level 1:") for line in lines)
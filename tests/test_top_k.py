@@ -0,0 +1,45 @@
+"""Top-k rules against the sorted rules of a full run."""
+import pytest
+
+from conftest import MIN_CONFIDENCE, MIN_SUPPORT, miners
+
+def ranking(rules, order, tie):
+    return sorted(((getattr(rule, order), getattr(rule, tie)) for rule in rules), reverse=True)
+
+@pytest.mark.parametrize("k", (1, 25, 100000))
+@pytest.mark.parametrize("order", ("confidence", "lift"))
+@pytest.mark.parametrize("algorithm", miners.ALGORITHMS)
+def test_top_k_by_measure(store, reference_miner, algorithm, order, k):
+    miner = miners.build_miner(algorithm, MIN_SUPPORT, MIN_CONFIDENCE)
+    _, rules, _, _ = miner.run_top_k(store, k, order)
+    expected = ranking(reference_miner.association_rules, order, "support_count")[:k]
+    # Best first, ties go to the higher support
+    assert [(getattr(rule, order), rule.support_count) for rule in rules] == expected
+    assert miner.min_support == MIN_SUPPORT
+
+@pytest.mark.parametrize("k", (1, 25, 100000))
+@pytest.mark.parametrize("rule_engine", miners.Apriori.RULE_ENGINES)
+def test_top_k_by_support_raises_the_threshold(store, reference_miner, rule_engine, k):
+    miner = miners.Apriori(MIN_SUPPORT, MIN_CONFIDENCE, rule_engine=rule_engine)
+    _, rules, _, _ = miner.run_top_k(store, k, "support")
+    expected = ranking(reference_miner.association_rules, "support_count", "confidence")[:k]
+    assert [(rule.support_count, rule.confidence) for rule in rules] == expected
+
+    # The threshold ends at the weakest rule kept, and only what reaches it is reported
+    assert miner.min_support == (rules[-1].support_count if len(rules) == k else MIN_SUPPORT)
+    assert all(count >= miner.min_support for itemsets in miner.frequent_itemsets.values() for count in itemsets.values())
+    if len(rules) == k:
+        counted = sum(stats["generated"] for level, stats in miner.level_stats.items() if level > 1)
+        assert counted < sum(stats["generated"] for level, stats in reference_miner.level_stats.items() if level > 1)
+
+def test_top_k_by_support_with_a_floor_of_one(store):
+    # A full run at minsup 1 would count every combination, the rising threshold keeps this small
+    miner = miners.Apriori(1, MIN_CONFIDENCE)
+    _, rules, _, _ = miner.run_top_k(store, 5, "support")
+    assert len(rules) == 5
+    assert miner.min_support == rules[-1].support_count > 1
+
+@pytest.mark.parametrize("k, order", ((0, "confidence"), (5, "leverage")))
+def test_invalid_arguments(store, k, order):
+    with pytest.raises(ValueError):
+        miners.Apriori(MIN_SUPPORT, MIN_CONFIDENCE).run_top_k(store, k, order)
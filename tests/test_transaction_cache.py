@@ -0,0 +1,47 @@
+"""The memory-mapped cache of encoded transactions: reuse, staleness and eviction."""
+import os
+
+from transaction_loader import CACHE_SUFFIX, load_cached_transactions, load_transactions
+
+def contents(transactions):
+    return [[transactions.item_names[item] for item in transaction] for transaction in transactions], list(transactions.count_items())
+
+def test_cache_is_built_and_reused(transactions_file):
+    built = load_cached_transactions(transactions_file)
+    assert os.path.exists(transactions_file + CACHE_SUFFIX)
+    assert not hasattr(built, "buffer")
+
+    cached = load_cached_transactions(transactions_file)
+    assert hasattr(cached, "buffer")
+    assert contents(cached) == contents(built) == contents(load_transactions(transactions_file))
+
+def test_changed_input_rebuilds_the_cache(tmp_path):
+    file_name = str(tmp_path / "input.txt")
+    with open(file_name, "w") as file:
+        file.write("1 10\n1 11\n2 10\n")
+    load_cached_transactions(file_name)
+
+    # Same size and modification time, only the content hash tells the inputs apart
+    stat = os.stat(file_name)
+    with open(file_name, "w") as file:
+        file.write("1 10\n1 12\n2 10\n")
+    os.utime(file_name, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    transactions = load_cached_transactions(file_name)
+    assert not hasattr(transactions, "buffer")
+    assert contents(transactions) == contents(load_transactions(file_name))
+    assert hasattr(load_cached_transactions(file_name), "buffer")
+
+def test_corrupt_cache_is_evicted(transactions_file):
+    load_cached_transactions(transactions_file)
+    with open(transactions_file + CACHE_SUFFIX, "r+b") as file:
+        file.truncate(20)
+    transactions = load_cached_transactions(transactions_file)
+    assert contents(transactions) == contents(load_transactions(transactions_file))
+    assert hasattr(load_cached_transactions(transactions_file), "buffer")
+
+def test_unremovable_stale_entry_falls_back_to_parsing(transactions_file):
+    # A directory in place of the cache can neither be read, removed nor replaced
+    os.mkdir(transactions_file + CACHE_SUFFIX)
+    transactions = load_cached_transactions(transactions_file)
+    assert contents(transactions) == contents(load_transactions(transactions_file))
@@ -0,0 +1,41 @@
+"""Parsing "tid item" files into transactions and the compact store."""
+import pytest
+
+from transaction_loader import TransactionStore, count_transactions, load_transactions, read_pairs, read_transactions
+
+def write(tmp_path, data):
+    file_name = tmp_path / "input.txt"
+    file_name.write_bytes(data)
+    return str(file_name)
+
+@pytest.mark.parametrize("block_size", (5, 1 << 22))
+@pytest.mark.parametrize("data", (
+    b"1 10\n1 11\n2 10\n3 12\n3 10\n",
+    b"1 10\r\n1\t11\r\n\r\n2 10\n  \n3  12 \n3 10",
+))
+def test_layouts(tmp_path, data, block_size):
+    file_name = write(tmp_path, data)
+    pairs = [pair for transaction_ids, item_ids in read_pairs(file_name, block_size) for pair in zip(transaction_ids, item_ids)]
+    assert pairs == [(1, 10), (1, 11), (2, 10), (3, 12), (3, 10)]
+    assert list(read_transactions(file_name)) == [[10, 11], [10], [12, 10]]
+    assert count_transactions(file_name) == 3
+
+@pytest.mark.parametrize("block_size", (5, 1 << 22))
+@pytest.mark.parametrize("data, line", (
+    (b"1 10\n1 11 12\n2 10\n", 2),
+    (b"1 10\n1\n2 10 11\n", 2),
+    (b"1 10\n1 x\n", 2),
+    (b"1 10\n1 11\n\n2", 4),
+))
+def test_malformed_line_is_reported(tmp_path, data, line, block_size):
+    file_name = write(tmp_path, data)
+    with pytest.raises(ValueError, match=f"line {line}: expected 'transaction_id item_id'"):
+        list(read_pairs(file_name, block_size))
+
+def test_store_encoding(tmp_path):
+    transactions = load_transactions(write(tmp_path, b"1 10\n1 11\n1 10\n2 11\n2 12\n"))
+    assert isinstance(transactions, TransactionStore)
+    assert transactions.item_names == ["10", "11", "12"]
+    # Items are unique and sorted inside each transaction
+    assert [list(transaction) for transaction in transactions] == [[0, 1], [1, 2]]
+    assert transactions.count_items() == [1, 2, 1]
@@ -0,0 +1,47 @@
+"""FUP-style updates against a full run over all transactions."""
+import pytest
+
+from benchmark import write_transactions
+from conftest import MIN_CONFIDENCE, MIN_SUPPORT, itemsets_by_name, miners, rules_by_name
+from transaction_loader import TransactionStore
+
+@pytest.mark.parametrize("mode", miners.Apriori.MINING_MODES)
+def test_update_matches_full_run(tmp_path, transactions, reference, mode):
+    miner = miners.Apriori(MIN_SUPPORT, MIN_CONFIDENCE, mode=mode)
+    miner.run(TransactionStore.from_transactions(transactions[:200]))
+    miner.update(transactions[200:300])
+
+    # The rest goes through a saved state, with the batches seen so far as history
+    state_file = str(tmp_path / "state.json")
+    miner.save_state(state_file)
+    restored = miners.Apriori.load_state(state_file)
+    restored.update(transactions[300:], history=miner.history)
+    assert (itemsets_by_name(restored), rules_by_name(restored)) == reference
+    assert restored.num_transactions == len(transactions)
+    assert restored.max_transaction_length == max(len(transaction) for transaction in transactions)
+
+def test_empty_level_one_is_kept(transactions):
+    miner = miners.Apriori(len(transactions) + 1, MIN_CONFIDENCE)
+    miner.run(TransactionStore.from_transactions(transactions[:200]))
+    miner.update(transactions[200:])
+    assert miner.frequent_itemsets == {1: {}}
+
+def test_execute_update_rewrites_the_output_files(tmp_path, monkeypatch, transactions):
+    monkeypatch.chdir(tmp_path)
+    write_transactions(transactions[:250], "day1.txt")
+    write_transactions(transactions[250:], "day2.txt")
+    write_transactions(transactions, "all.txt")
+
+    miners.execute_program(MIN_SUPPORT, MIN_CONFIDENCE, "all.txt")
+    expected = {name: (tmp_path / name).read_text() for name in ("items03.txt", "rules03.txt", "info03.txt")}
+
+    miners.execute_program(MIN_SUPPORT, MIN_CONFIDENCE, "day1.txt", state_file="state.json")
+    miners.execute_update("state.json", "day2.txt", ["day1.txt"])
+    assert (tmp_path / "items03.txt").read_text() == expected["items03.txt"]
+    assert (tmp_path / "rules03.txt").read_text() == expected["rules03.txt"]
+
+    # Same summary as the full run, only the input label and the timings differ
+    def summary(text):
+        return [line for line in text.splitlines() if not line.startswith(("input file", "Time", "Level", "Per-level"))]
+    assert summary((tmp_path / "info03.txt").read_text()) == summary(expected["info03.txt"])
+    assert "input file: state.json + day2.txt" in (tmp_path / "info03.txt").read_text()
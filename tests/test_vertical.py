@@ -0,0 +1,13 @@
+"""Vertical Eclat mining over tid bitsets against the horizontal reference."""
+from conftest import MIN_CONFIDENCE, MIN_SUPPORT, itemsets_by_name, miners, rules_by_name
+
+def test_vertical_matches_horizontal(store, reference):
+    miner = miners.build_miner("eclat", MIN_SUPPORT, MIN_CONFIDENCE)
+    assert miner.mode == "vertical"
+    miner.run(store)
+    assert (itemsets_by_name(miner), rules_by_name(miner)) == reference
+
+def test_tid_bitsets(store):
+    bitsets = miners.Apriori(1, MIN_CONFIDENCE, mode="vertical").build_tid_bitsets(store)
+    for item, bits in bitsets.items():
+        assert bits == sum(1 << tid for tid, transaction in enumerate(store) if item in transaction)
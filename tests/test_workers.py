@@ -0,0 +1,21 @@
+"""Multiprocess shard counting against single-process counting."""
+import pytest
+
+from conftest import MIN_CONFIDENCE, MIN_SUPPORT, itemsets_by_name, miners, rules_by_name
+
+@pytest.mark.parametrize("counter", miners.Apriori.COUNTING_ENGINES)
+def test_workers_match_single_process(store, reference, counter):
+    miner = miners.Apriori(MIN_SUPPORT, MIN_CONFIDENCE, counter=counter, workers=3)
+    miner.run(store)
+    assert (itemsets_by_name(miner), rules_by_name(miner)) == reference
+
+@pytest.mark.parametrize("workers", (2, 5))
+def test_shards_cover_every_transaction(store, workers):
+    candidates = [(0, 1), (1, 2), (0, 2), (3, 4)]
+    shards = miners.SharedTransactionShards(store, workers, "trie")
+    try:
+        assert shards.shards[0][0] == 0 and shards.shards[-1][1] == len(store)
+        assert all(end == start for (_, end), (start, _) in zip(shards.shards, shards.shards[1:]))
+        assert shards.count_support(candidates) == miners.Apriori(1, MIN_CONFIDENCE).count_support(candidates, store)
+    finally:
+        shards.close()
@@ -0,0 +1,270 @@
+"""Streaming loader for "transaction_id item_id" files and the compact transaction store the miners use."""
+from itertools import islice
+from array import array
+import hashlib
+import json
+import mmap
+import os
+import re
+
+# Bytes read from the input file per block, every block is split and converted to ints in one go
+BLOCK_SIZE = 1 << 22
+
+# Any number of lines holding two integers or nothing, blocks not in the plain "digits space digits" layout are
+# checked against it before the bulk split
+PAIR_LINES = re.compile(rb"(?:[ \t\r]*(?:[+-]?\d+[ \t]+[+-]?\d+[ \t\r]*)?\n)*")
+DIGITS = b"0123456789"
+
+# Binary cache layout: magic, 8-byte header length, JSON header, then 8-byte aligned array sections
+CACHE_MAGIC = b"TXNCACHE"
+CACHE_VERSION = 1
+CACHE_SUFFIX = ".txncache"
+
+class TransactionStore:
+    """Compact CSR container: transaction t holds the item ids items[offsets[t]:offsets[t + 1]].
+
+    Items are dense int32 ids, sorted and unique inside each transaction. item_names maps an id back
+    to its original name, which is only needed again when writing output.
+    """
+
+    def __init__(self, offsets, items, item_index, item_counts=None):
+        self.offsets = offsets
+        self.items = items
+        self.item_index = item_index
+        self.item_names = [str(item) for item in item_index]
+        self.item_counts = item_counts
+
+    @classmethod
+    def from_transactions(cls, transactions, item_index=None):
+        """Encode an iterable of transactions, ids are handed out in order of first appearance.
+
+        A given item_index (name -> id) is reused and extended, so several stores can share one encoding.
+        """
+        item_index = {} if item_index is None else item_index
+        offsets = array("i", [0])
+        items = array("i")
+        for transaction in transactions:
+            encoded = set()
+            for item in transaction:
+                item_id = item_index.get(item)
+                if item_id is None:
+                    item_id = item_index[item] = len(item_index)
+                encoded.add(item_id)
+            items.extend(sorted(encoded))
+            offsets.append(len(items))
+        return cls(offsets, items, item_index)
+
+    def count_items(self):
+        """Support count of every item id, computed on the first call."""
+        if self.item_counts is None:
+            item_counts = [0] * len(self.item_names)
+            for item in self.items:
+                item_counts[item] += 1
+            self.item_counts = item_counts
+        return self.item_counts
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, tid):
+        return self.items[self.offsets[tid]:self.offsets[tid + 1]]
+
+    def __iter__(self):
+        offsets, items = self.offsets, self.items
+        for tid in range(len(offsets) - 1):
+            yield items[offsets[tid]:offsets[tid + 1]]
+
+def parse_block(block, file_name, first_line):
+    """Split a block of complete "tid item" lines into (transaction_ids, item_ids) in bulk, blank lines are skipped.
+
+    A block of "digits space digits" lines is recognised with two whole-block checks. Any other layout is validated
+    with PAIR_LINES, and a block that fails is only walked line by line to name the offending line.
+    """
+    fields = block.split()
+    lines = block.count(b"\n")
+    # Without its digits every such line is a single space, and two fields per line rule out a missing number
+    if len(fields) != 2 * lines or block.translate(None, DIGITS) != b" \n" * lines:
+        if PAIR_LINES.fullmatch(block) is None:
+            for line_number, line in enumerate(block.split(b"\n"), first_line):
+                if PAIR_LINES.fullmatch(line + b"\n") is None:
+                    raise ValueError(f"{file_name}, line {line_number}: expected 'transaction_id item_id', got {line.decode(errors='replace')!r}")
+    values = list(map(int, fields))
+    return values[0::2], values[1::2]
+
+def read_pairs(file_name, block_size=BLOCK_SIZE):
+    """Yield (transaction_ids, item_ids) lists parsed in bulk from each block of a "tid item" file.
+
+    A malformed line raises ValueError instead of shifting the pairs after it.
+    """
+    remainder = b""
+    line_number = 1
+    with open(file_name, "rb") as file:
+        while True:
+            block = file.read(block_size)
+            if not block:
+                break
+
+            # Only parse up to the last complete line, the rest is carried over to the next block
+            block = remainder + block
+            end = block.rfind(b"\n") + 1
+            block, remainder = block[:end], block[end:]
+            if block:
+                yield parse_block(block, file_name, line_number)
+                line_number += block.count(b"\n")
+
+    # The last line may not end with a newline
+    if remainder.strip():
+        yield parse_block(remainder + b"\n", file_name, line_number)
+
+def read_transactions(file_name):
+    """Yield the item ids of each transaction, a new transaction starts whenever the transaction id changes."""
+    current_transaction = []
+    previous_transaction_id = None
+    for transaction_ids, item_ids in read_pairs(file_name):
+        for transaction_id, item_id in zip(transaction_ids, item_ids):
+            if transaction_id != previous_transaction_id:
+                if current_transaction:
+                    yield current_transaction
+                current_transaction = []
+                previous_transaction_id = transaction_id
+            current_transaction.append(item_id)
+
+    # Add the last transaction
+    if current_transaction:
+        yield current_transaction
+
+def count_transactions(file_name):
+    """Count the transactions of a file without building them."""
+    count = 0
+    previous_transaction_id = None
+    for transaction_ids, _ in read_pairs(file_name):
+        for transaction_id in transaction_ids:
+            if transaction_id != previous_transaction_id:
+                count += 1
+                previous_transaction_id = transaction_id
+    return count
+
+def load_transactions(file_name, item_index=None):
+    """Parse a file straight into a TransactionStore, optionally extending an existing item_index."""
+    return TransactionStore.from_transactions(read_transactions(file_name), item_index)
+
+def cache_key(file_name):
+    """Identify the exact input a cache was built from: path, size, modification time and content hash."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_name, "rb") as file:
+        for block in iter(lambda: file.read(BLOCK_SIZE), b""):
+            digest.update(block)
+    stat = os.stat(file_name)
+    return {"path": os.path.abspath(file_name), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": digest.hexdigest()}
+
+def write_cache(transactions, cache_file, key):
+    """Write a store (with integer item names) and its item counts to a binary cache file."""
+    sections = {
+        "offsets": array("i", transactions.offsets),
+        "items": array("i", transactions.items),
+        "item_labels": array("q", transactions.item_index),
+        "item_counts": array("i", transactions.count_items()),
+    }
+
+    # Lay the sections out after the header, each one starting on an 8-byte boundary
+    layout = []
+    position = 0
+    for name, values in sections.items():
+        layout.append((name, values.typecode, position, len(values) * values.itemsize))
+        position += -(-len(values) * values.itemsize // 8) * 8
+    header = json.dumps({"version": CACHE_VERSION, "key": key, "sections": layout}).encode()
+    data_start = -(-(len(CACHE_MAGIC) + 8 + len(header)) // 8) * 8
+
+    # Write to a temporary file first so a reader never maps a half written cache
+    temporary_file = f"{cache_file}.{os.getpid()}.tmp"
+    with open(temporary_file, "wb") as file:
+        file.write(CACHE_MAGIC + len(header).to_bytes(8, "little") + header)
+        for (name, _, start, _), values in zip(layout, sections.values()):
+            file.seek(data_start + start)
+            values.tofile(file)
+    os.replace(temporary_file, cache_file)
+
+def read_cache(cache_file, key):
+    """Memory-map a cache file as a TransactionStore, None when it was built from a different input."""
+    try:
+        with open(cache_file, "rb") as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if buffer[:len(CACHE_MAGIC)] != CACHE_MAGIC:
+            return None
+        header_end = len(CACHE_MAGIC) + 8 + int.from_bytes(buffer[len(CACHE_MAGIC):len(CACHE_MAGIC) + 8], "little")
+        header = json.loads(buffer[len(CACHE_MAGIC) + 8:header_end])
+        if header["version"] != CACHE_VERSION or header["key"] != key:
+            return None
+        data_start = -(-header_end // 8) * 8
+        view = memoryview(buffer)
+        sections = {
+            name: view[data_start + start:data_start + start + size].cast(typecode)
+            for name, typecode, start, size in header["sections"]
+        }
+    except (OSError, ValueError, KeyError):
+        # Unreadable or truncated caches are treated as stale
+        return None
+
+    item_index = {label: item_id for item_id, label in enumerate(sections["item_labels"])}
+    transactions = TransactionStore(sections["offsets"], sections["items"], item_index, sections["item_counts"])
+    # The arrays are views into the mapping, keep it alive as long as the store
+    transactions.buffer = buffer
+    return transactions
+
+def load_cached_transactions(file_name):
+    """Load a file through its binary cache, building or rebuilding the cache when it is missing or stale."""
+    cache_file = file_name + CACHE_SUFFIX
+    key = cache_key(file_name)
+    if os.path.exists(cache_file):
+        transactions = read_cache(cache_file, key)
+        if transactions is not None:
+            return transactions
+        # Stale entry, evict it before rebuilding
+        try:
+            os.remove(cache_file)
+        except OSError:
+            # Same as a failed write below, the file is still loaded without the cache
+            pass
+
+    transactions = load_transactions(file_name)
+    try:
+        write_cache(transactions, cache_file, key)
+    except OSError:
+        # A read-only input directory only means no cache for the next run
+        pass
+    return transactions
+
+def dump_transactions(transactions, output_file="transactions.txt"):
+    """Write every transaction of a store as a list of item names, one per line, for debugging."""
+    with open(output_file, "w") as file:
+        for transaction in transactions:
+            file.write(f"{[transactions.item_names[item] for item in transaction]}\n")
+
+class TransactionFile:
+    """Re-iterable view of a "transaction_id item_id" file that never holds more than one chunk in memory."""
+
+    def __init__(self, file_name, chunk_size):
+        self.file_name = file_name
+        self.chunk_size = chunk_size
+        self.num_transactions = None
+
+    def __len__(self):
+        # Counted with one streaming scan the first time it is needed
+        if self.num_transactions is None:
+            self.num_transactions = count_transactions(self.file_name)
+        return self.num_transactions
+
+    def __iter__(self):
+        return read_transactions(self.file_name)
+
+    def chunks(self, item_index):
+        """Yield the file as TransactionStores of at most chunk_size transactions sharing item_index."""
+        # Spread the transactions evenly, a small trailing chunk would get a tiny scaled threshold
+        num_chunks = max(1, -(-len(self) // self.chunk_size))
+        balanced_size = -(-len(self) // num_chunks)
+        transactions = read_transactions(self.file_name)
+        while True:
+            chunk = TransactionStore.from_transactions(islice(transactions, balanced_size), item_index)
+            if not len(chunk):
+                return
+            yield chunk